@@ -2,6 +2,9 @@ import pygame
 import random
 import math
 
+import entity_pool
+import results_client
+
 pygame.init()
 
 # --------------------------
@@ -15,6 +18,14 @@ GRAVITY = 0.8
 JUMP_VELOCITY = -15
 PLAYER_SPEED = 5
 ENEMY_SPEED = 2
+LAST_LEVEL = 3
+
+# Enemy navigation
+ENEMY_SIZE = 30
+CHASE_RANGE = 300        # Enemies chase the player when this close (pixels); otherwise they patrol
+JUMP_SAMPLE_STEP = 10    # Spacing of the take-off points tried when building jump edges
+MAX_ARC_FRAMES = 240     # Longest jump or fall simulated when building the graph
+WALK, JUMP, FALL = 0, 1, 2
 
 # Ground level (top of floor platform)
 GROUND_Y = SCREEN_HEIGHT - 20
@@ -48,10 +59,249 @@ def draw_star(size, color):
     pygame.draw.polygon(surface, color, points)
     return surface
 
+def filled_surface(size, color):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+# Sprites of the same kind and size share one image; nothing draws on them.
+_images = {}
+
+def shared_image(key, make):
+    image = _images.get(key)
+    if image is None:
+        image = _images[key] = make()
+    return image
+
+# --------------------------
+# SWEPT COLLISION
+# --------------------------
+# Bodies cross a whole step in one exact sweep instead of moving by full
+# deltas and fixing overlaps afterwards, so nothing tunnels through a thin
+# platform however long the step. In the air a body follows the curve
+# through the points the per-frame rule (vel_y += GRAVITY; y += vel_y)
+# reaches at whole frames, which is why one long step lands, blocks and
+# stomps exactly where the same span of one-frame steps would.
+CONTACT_EPSILON = 1e-7
+MAX_STEP_CONTACTS = 32   # Contacts resolved in one step before the rest of it is dropped
+
+# The left, right and top edges of the screen are solid.
+SCREEN_WALLS = [
+    pygame.Rect(-SCREEN_WIDTH, -SCREEN_HEIGHT, SCREEN_WIDTH, 3 * SCREEN_HEIGHT),
+    pygame.Rect(SCREEN_WIDTH, -SCREEN_HEIGHT, SCREEN_WIDTH, 3 * SCREEN_HEIGHT),
+    pygame.Rect(-SCREEN_WIDTH, -SCREEN_HEIGHT, 3 * SCREEN_WIDTH, SCREEN_HEIGHT),
+]
+
+def fall(y, vy, ay, t):
+    """
+    Returns (y, vel_y) after t frames (not necessarily whole) under gravity ay.
+    """
+    return y + (vy + ay / 2) * t + ay / 2 * t * t, vy + ay * t
+
+def solve_quadratic(a, b, c):
+    """
+    Returns the real roots of a*t*t + b*t + c = 0.
+    """
+    if a == 0:
+        return (-c / b,) if b != 0 else ()
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return ()
+    root = math.sqrt(disc)
+    return ((-b - root) / (2 * a), (-b + root) / (2 * a))
+
+def time_of_impact(x, y, w, h, vx, vy, ay, duration, box):
+    """
+    Returns (t, axis) for the first moment in [0, duration] at which a w*h box
+    at (x, y), moving at vx and falling from vertical speed vy under gravity
+    ay, starts to overlap box; or None. axis is "x" for a side contact, "y"
+    for a top or bottom contact and None if they overlap from the start.
+    """
+    bx, by, bw, bh = box
+    # Cheap reject against the bounds of the whole sweep.
+    x_end = x + vx * duration
+    if max(x, x_end) + w <= bx or min(x, x_end) >= bx + bw:
+        return None
+    b = vy + ay / 2
+    y_end = fall(y, vy, ay, duration)[0]
+    y_low, y_high = min(y, y_end), max(y, y_end)
+    if ay and 0 < -b / ay < duration:
+        y_apex = fall(y, vy, ay, -b / ay)[0]
+        y_low, y_high = min(y_low, y_apex), max(y_high, y_apex)
+    if y_high + h <= by or y_low >= by + bh:
+        return None
+
+    def overlap_x(t, slack=0):
+        px = x + vx * t
+        return px + w > bx + slack and px < bx + bw - slack
+
+    def overlap_y(t, slack=0):
+        py = fall(y, vy, ay, t)[0]
+        return py + h > by + slack and py < by + bh - slack
+
+    # Overlap can only start or stop where an edge of one box crosses an
+    # edge of the other, so checking between those moments is exact.
+    times = [0.0, duration]
+    if vx:
+        times += [(bx - w - x) / vx, (bx + bw - x) / vx]
+    times += solve_quadratic(ay / 2, b, y + h - by) + solve_quadratic(ay / 2, b, y - by - bh)
+    times = sorted({t for t in times if 0 <= t <= duration})
+    for start, end in zip(times, times[1:]):
+        mid = (start + end) / 2
+        if end - start > CONTACT_EPSILON and overlap_x(mid) and overlap_y(mid):
+            in_x = overlap_x(start, CONTACT_EPSILON)
+            in_y = overlap_y(start, CONTACT_EPSILON)
+            if in_x and in_y:
+                return start, None
+            return start, "x" if in_y else "y"
+    return None
+
+def first_contact(x, y, w, h, vx, vy, ay, duration, boxes):
+    """
+    Returns (t, index, axis) for the earliest contact with any of boxes,
+    or None. Boxes the body already overlaps are ignored.
+    """
+    best = None
+    for i, box in enumerate(boxes):
+        hit = time_of_impact(x, y, w, h, vx, vy, ay, duration if best is None else best[0], box)
+        if hit is not None and hit[1] is not None and (best is None or hit[0] < best[0]):
+            best = hit[0], i, hit[1]
+    return best
+
+def predicted_motion(sprite, t):
+    """
+    Returns (x, y, vx, vel_y, gravity) for sprite t frames ahead if it keeps
+    its current motion. Sprites that are not Bodies stand still.
+    """
+    if not isinstance(sprite, Body):
+        return sprite.rect.x, sprite.rect.y, 0, 0, 0
+    vx = getattr(sprite, "vx", 0)
+    if sprite.ground is not None or sprite.vel_y == 0:
+        # Standing (or just placed): only walking is predicted.
+        return sprite.pos_x + vx * t, sprite.pos_y, vx, 0, 0
+    y, vy = fall(sprite.pos_y, sprite.vel_y, GRAVITY, t)
+    return sprite.pos_x + vx * t, y, vx, vy, GRAVITY
+
+def move_body(body, vx, duration, solids, targets=(), on_target=None, stop_on_contact=False):
+    """
+    Moves body (a Body) for duration frames at horizontal speed vx. Solids
+    stop it: landing on one sets body.ground to its index, a side contact
+    holds it against that solid's side until it rises or falls past the
+    solid, then it moves sideways again. Touching one of
+    targets calls on_target(target, axis) at that moment, then the step
+    carries on from wherever the callback left the body. Targets are swept
+    along their own current motion (see predicted_motion), since they only
+    move after the body does. With stop_on_contact the move ends at the
+    first solid contact instead, so the caller can react and move on.
+    Returns whether the body was blocked sideways and how many frames it
+    moved.
+    """
+    w, h = body.rect.size
+    targets = list(targets) if on_target is not None else []
+    blocked = False
+    blocker = None           # Solid whose side the body is pressed against
+    elapsed = 0.0
+    for _ in range(MAX_STEP_CONTACTS):
+        remaining = duration - elapsed
+        if remaining <= CONTACT_EPSILON:
+            break
+        x, y = body.pos_x, body.pos_y
+
+        # Held against a side only while the two boxes still overlap vertically.
+        move_x = vx
+        if blocker is not None:
+            bx, by, bw, bh = solids[blocker]
+            if y + h > by + CONTACT_EPSILON and y < by + bh - CONTACT_EPSILON:
+                move_x = 0
+            else:
+                blocker = None
+
+        # A standing body keeps still vertically until it walks off every support.
+        ay, span, body.ground = GRAVITY, remaining, None
+        if body.vel_y >= 0:
+            leave = 0
+            for i, (bx, by, bw, bh) in enumerate(solids):
+                if abs(y + h - by) <= CONTACT_EPSILON and x + w > bx and x < bx + bw:
+                    body.ground = i
+                    if move_x > 0:
+                        leave = max(leave, (bx + bw - x) / move_x)
+                    elif move_x < 0:
+                        leave = max(leave, (bx - w - x) / move_x)
+                    else:
+                        leave = remaining
+            if body.ground is not None:
+                ay, span, body.vel_y = 0, min(remaining, leave), 0
+        vy = body.vel_y
+        if blocker is not None:
+            # End this segment when the body rises or falls clear of the blocker.
+            _, by, _, bh = solids[blocker]
+            for t in solve_quadratic(ay / 2, vy + ay / 2, y + h - by) + solve_quadratic(ay / 2, vy + ay / 2, y - by - bh):
+                if CONTACT_EPSILON < t < span:
+                    span = t
+
+        hit = first_contact(x, y, w, h, move_x, vy, ay, span, solids)
+        step = span if hit is None else hit[0]
+        touched = None
+        for target in targets:
+            # Sweep in the target's frame of reference.
+            tx, ty, tvx, tvy, tay = predicted_motion(target, elapsed)
+            contact = time_of_impact(x - tx, y - ty, w, h, move_x - tvx, vy - tvy, ay - tay, step,
+                                     (0, 0, target.rect.width, target.rect.height))
+            if contact is not None and (touched is None or contact[0] < touched[0]):
+                touched = contact[0], target, contact[1]
+        if touched is not None:
+            step = touched[0]
+
+        body.pos_x = x + move_x * step
+        body.pos_y, body.vel_y = fall(y, vy, ay, step)
+        elapsed += step
+
+        if touched is not None:
+            _, target, axis = touched
+            targets.remove(target)
+            on_target(target, axis)
+            # The callback may have moved the body (a respawn).
+            blocker = None
+        elif hit is not None:
+            _, i, axis = hit
+            bx, by, bw, bh = solids[i]
+            if axis == "x":
+                body.pos_x = bx - w if move_x > 0 else bx + bw
+                blocker = i
+                blocked = True
+            elif abs(body.pos_y + h - by) <= abs(body.pos_y - by - bh):
+                # Landed on top.
+                body.pos_y = by - h
+                body.vel_y = 0
+                body.ground = i
+            else:
+                # Bumped a head on the underside.
+                body.pos_y = by + bh
+                body.vel_y = 0
+            if stop_on_contact:
+                break
+    body.rect.topleft = (round(body.pos_x), round(body.pos_y))
+    return blocked, elapsed
+
 # --------------------------
 # SPRITE CLASSES
 # --------------------------
-class Player(pygame.sprite.Sprite):
+class Body(pygame.sprite.Sprite):
+    """
+    A sprite moved by move_body. pos_x and pos_y hold its exact position;
+    rect is that position rounded to whole pixels.
+    """
+    def init_body(self):
+        self.pos_x, self.pos_y = self.rect.topleft
+        self.vel_y = 0
+        self.ground = None
+
+    def sync_position(self):
+        # Pick up moves made directly on rect, such as a respawn.
+        if self.rect.topleft != (round(self.pos_x), round(self.pos_y)):
+            self.pos_x, self.pos_y = self.rect.topleft
+
+class Player(Body):
     def __init__(self, x):
         super().__init__()
         self.image = pygame.Surface((30, 40))
@@ -60,67 +310,54 @@ class Player(pygame.sprite.Sprite):
         self.rect.x = x
         # Align player's bottom to ground.
         self.rect.bottom = GROUND_Y
-        self.vel_y = 0
+        self.init_body()
         self.speed = PLAYER_SPEED
+        self.reset()
+
+    def reset(self):
+        # A fresh run for the same sprite.
         self.score = 0
         self.lives = 3
         self.coins = 0
 
-    def update(self, platforms, enemies):
-        keys = pygame.key.get_pressed()
-        dx = 0
-        if keys[pygame.K_LEFT]:
-            dx = -self.speed
-        if keys[pygame.K_RIGHT]:
-            dx = self.speed
-
-        # --- HORIZONTAL MOVEMENT ---
-        self.rect.x += dx
-        # Resolve horizontal collisions
-        for plat in platforms:
-            if self.rect.colliderect(plat.rect):
-                if dx > 0:
-                    self.rect.right = plat.rect.left
-                elif dx < 0:
-                    self.rect.left = plat.rect.right
-
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
-
-        # --- VERTICAL MOVEMENT ---
-        self.vel_y += GRAVITY
-        self.rect.y += self.vel_y
-        # Resolve vertical collisions
-        for plat in platforms:
-            if self.rect.colliderect(plat.rect):
-                # Falling: snap to platform top
-                if self.vel_y > 0:
-                    self.rect.bottom = plat.rect.top
-                    self.vel_y = 0
-                # Jumping: stop upward movement
-                elif self.vel_y < 0:
-                    self.rect.top = plat.rect.bottom
-                    self.vel_y = 0
-
-        if self.rect.top < 0:
-            self.rect.top = 0
-            self.vel_y = 0
+    def update(self, platforms, enemies, dt=1, dx=None):
+        """
+        Advances the player dt frames. dx is the horizontal speed in pixels
+        per frame; by default it is read from the arrow keys.
+        """
+        if dx is None:
+            keys = pygame.key.get_pressed()
+            dx = 0
+            if keys[pygame.K_LEFT]:
+                dx = -self.speed
+            if keys[pygame.K_RIGHT]:
+                dx = self.speed
+
+        self.sync_position()
+        solids = [plat.rect for plat in platforms] + SCREEN_WALLS
+        move_body(self, dx, dt, solids, enemies, self.touch_enemy)
+
         if self.rect.bottom > SCREEN_HEIGHT:
             self.rect.bottom = GROUND_Y
             self.vel_y = 0
 
-        # --- ENEMY COLLISION ---
-        hit_enemy = pygame.sprite.spritecollideany(self, enemies)
-        if hit_enemy:
-            if self.vel_y > 0 and abs(self.rect.bottom - hit_enemy.rect.top) < 20:
-                hit_enemy.kill()
-                self.score += 10
-                self.vel_y = JUMP_VELOCITY
-            else:
-                self.lives -= 1
-                self.respawn()
+    def touch_enemy(self, enemy, axis):
+        """
+        Called by move_body at the moment the player touches an enemy:
+        coming down onto its top stomps it, anything else costs a life.
+        """
+        if axis is None:
+            # Already overlapping, e.g. the enemy walked into the player.
+            stomp = self.vel_y > 0 and abs(self.pos_y + self.rect.height - enemy.rect.top) < 20
+        else:
+            stomp = axis == "y" and self.vel_y > 0 and self.pos_y < enemy.rect.top
+        if stomp:
+            enemy.kill()
+            self.score += 10
+            self.vel_y = JUMP_VELOCITY
+        else:
+            self.lives -= 1
+            self.respawn()
 
     def jump(self):
         if self.vel_y == 0:
@@ -129,83 +366,405 @@ class Player(pygame.sprite.Sprite):
     def respawn(self):
         self.rect.x = 50
         self.rect.bottom = GROUND_Y
+        self.pos_x, self.pos_y = self.rect.topleft
         self.vel_y = 0
 
 class Platform(pygame.sprite.Sprite):
     def __init__(self, x, y, width):
         super().__init__()
-        self.image = pygame.Surface((width, 20))
-        self.image.fill(WHITE)
+        self.reset(x, y, width)
+
+    def reset(self, x, y, width):
+        self.image = shared_image(("platform", width), lambda: filled_surface((width, 20), WHITE))
         self.rect = self.image.get_rect(topleft=(x, y))
 
-class Enemy(pygame.sprite.Sprite):
+class Enemy(Body):
     def __init__(self, x):
         super().__init__()
-        self.image = pygame.Surface((30, 30))
-        self.image.fill(RED)
+        self.reset(x)
+
+    def reset(self, x):
+        self.image = shared_image("enemy", lambda: filled_surface((ENEMY_SIZE, ENEMY_SIZE), RED))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.bottom = GROUND_Y
+        self.init_body()
         self.speed = ENEMY_SPEED
-
-    def update(self):
-        self.rect.x += self.speed
-        if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-            self.speed *= -1
+        self.vx = self.speed
+        self.node = None  # Navigation node (platform) the enemy last stood on
+
+    def update(self, platforms, nav, player, player_node, dt=1):
+        """
+        Advances the enemy dt frames. Every turn, take-off and landing
+        happens at its own moment inside the step, so one long step ends
+        where the same span of single frames would.
+        """
+        self.sync_position()
+        left = dt
+        for _ in range(MAX_STEP_CONTACTS):
+            if left <= CONTACT_EPSILON:
+                break
+            if self.node is None:
+                self.node = nav.locate(self.rect)
+            on_ground = self.node is not None and self.vel_y >= 0 and nav.supports(self.node, self.rect)
+            span = left
+            if on_ground:
+                span = min(span, self.decide(nav, player, player_node))
+
+            # nav.solids lists the platforms in node order, then the screen walls.
+            blocked, moved = move_body(self, self.vx, span, nav.solids, stop_on_contact=True)
+            left -= moved
+            if blocked:
+                # Walk back the other way for the rest of the step.
+                self.speed = -self.speed
+                if not on_ground:
+                    self.vx = 0
+            if self.ground is not None and self.ground < len(nav.nodes):
+                self.node = self.ground
+        if self.rect.top > SCREEN_HEIGHT:
+            self.kill()
+
+    def decide(self, nav, player, player_node):
+        """
+        Picks the enemy's move from the precomputed next-hop table: walk
+        toward the player on the same platform, otherwise head for the jump
+        or drop that starts the shortest route to the player's platform.
+        Returns how many frames the move holds before the enemy must decide
+        again.
+        """
+        dx = player.rect.centerx - self.rect.centerx
+        edge = None
+        if player_node is not None and abs(dx) <= CHASE_RANGE:
+            if player_node == self.node:
+                to_player = player.rect.centerx - self.rect.width / 2 - self.pos_x
+                if abs(to_player) <= CONTACT_EPSILON:
+                    self.vx = 0
+                    return math.inf
+                self.vx = math.copysign(ENEMY_SPEED, to_player)
+                return min(abs(to_player) / ENEMY_SPEED, self.keep_on_platform(nav))
+            edge = nav.next_edge[self.node][player_node]
+        if edge is None:
+            # Patrol: walk back and forth without leaving the platform.
+            self.vx = self.speed
+            span = self.keep_on_platform(nav)
+            if self.vx == 0:
+                # Turned around at an end: carry on the other way at once.
+                self.vx = self.speed
+                span = self.keep_on_platform(nav)
+            return span
+
+        kind, _, takeoff_x, direction = edge
+        if kind == FALL:
+            self.vx = direction * ENEMY_SPEED
+            return math.inf
+        to_takeoff = takeoff_x - self.pos_x
+        if abs(to_takeoff) <= CONTACT_EPSILON:
+            self.pos_x = takeoff_x
+            self.vx = direction * ENEMY_SPEED
+            self.vel_y = JUMP_VELOCITY
+            return math.inf
+        self.vx = math.copysign(ENEMY_SPEED, to_takeoff)
+        return abs(to_takeoff) / ENEMY_SPEED
+
+    def keep_on_platform(self, nav):
+        """
+        Returns how many frames the enemy can keep walking at vx before it
+        reaches an end of its platform. At an end it stops instead, and a
+        patrol turns around.
+        """
+        left, right, _ = nav.nodes[self.node]
+        if self.vx < 0:
+            room = self.pos_x - left
+        elif self.vx > 0:
+            room = right - self.rect.width - self.pos_x
+        else:
+            return math.inf
+        # Only stop a walk that leads further off the platform: a jump can
+        # land overhanging an edge, and walking back on from there is fine.
+        if room > CONTACT_EPSILON:
+            return room / abs(self.vx)
+        if self.vx == self.speed:
+            self.speed = -self.speed
+        self.vx = 0
+        return math.inf
 
 class Coin(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.Surface((20, 20))
-        self.image.fill(YELLOW)
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.image = shared_image("coin", lambda: filled_surface((20, 20), YELLOW))
         self.rect = self.image.get_rect(topleft=(x, y))
 
 class Star(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = draw_star(30, GREEN)
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.image = shared_image("star", lambda: draw_star(30, GREEN))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
 
+# --------------------------
+# NAVIGATION GRAPH
+# --------------------------
+class NavGraph:
+    """
+    Platform surfaces an enemy can stand on, with the jumps and drops that
+    connect them. Built once per level layout from the game's own physics
+    constants; next_edge[i][j] is the first move on the cheapest route from
+    node i to node j, so an enemy's decision is a single table lookup.
+    Each edge is (kind, target, takeoff_x, direction).
+    """
+    def __init__(self, platform_rects, width=ENEMY_SIZE, height=ENEMY_SIZE):
+        self.width = width
+        self.height = height
+        self.rects = [tuple(r) for r in platform_rects]
+        # Node i is the top surface of platform i: (left, right, top).
+        self.nodes = [(x, x + w, y) for x, y, w, h in self.rects]
+        self.node_of = {rect: i for i, rect in enumerate(self.rects)}
+        self.solids = [pygame.Rect(r) for r in self.rects] + SCREEN_WALLS
+
+        n = len(self.nodes)
+        INF = float("inf")
+        dist = [[0 if i == j else INF for j in range(n)] for i in range(n)]
+        self.next_edge = [[None] * n for _ in range(n)]
+        for i, j, cost, edge in self.build_edges():
+            if cost < dist[i][j]:
+                dist[i][j] = cost
+                self.next_edge[i][j] = edge
+
+        # Floyd-Warshall, keeping the first hop of each shortest path.
+        for k in range(n):
+            dist_k = dist[k]
+            for i in range(n):
+                dist_ik = dist[i][k]
+                if dist_ik == INF:
+                    continue
+                dist_i = dist[i]
+                next_i = self.next_edge[i]
+                hop = next_i[k]
+                for j in range(n):
+                    if dist_ik + dist_k[j] < dist_i[j]:
+                        dist_i[j] = dist_ik + dist_k[j]
+                        next_i[j] = hop
+        self.dist = dist
+
+    def supports(self, node, rect):
+        left, right, top = self.nodes[node]
+        return rect.bottom == top and rect.right > left and rect.left < right
+
+    def locate(self, rect):
+        """
+        Returns the node the rect is standing on, or None if it is in the air.
+        """
+        for i in range(len(self.nodes)):
+            if self.supports(i, rect):
+                return i
+        return None
+
+    def build_edges(self):
+        """
+        Yields (from, to, cost, edge) for every drop off a platform end and
+        every jump (left, right or straight up) from sampled take-off points.
+        Costs are in frames: the walk from the platform's middle plus airtime.
+        """
+        for i, (left, right, top) in enumerate(self.nodes):
+            middle = (left + right - self.width) / 2
+            for direction, start_x in ((-1, left - self.width), (1, right)):
+                landing = self.simulate_arc(start_x, top, direction * ENEMY_SPEED, 0)
+                if landing is not None and landing[0] != i:
+                    j, frames = landing
+                    cost = abs(start_x - middle) / ENEMY_SPEED + frames
+                    yield i, j, cost, (FALL, j, start_x, direction)
+            for takeoff_x in range(max(0, left), min(right, SCREEN_WIDTH) - self.width + 1, JUMP_SAMPLE_STEP):
+                for direction in (-1, 0, 1):
+                    landing = self.simulate_arc(takeoff_x, top, direction * ENEMY_SPEED, JUMP_VELOCITY)
+                    if landing is not None and landing[0] != i:
+                        j, frames = landing
+                        cost = abs(takeoff_x - middle) / ENEMY_SPEED + frames
+                        yield i, j, cost, (JUMP, j, takeoff_x, direction)
+
+    def simulate_arc(self, x, bottom, vx, vy):
+        """
+        Sweeps an enemy-sized box through the air with move_body's rules and
+        returns (landing node, frames), or None if it is blocked sideways,
+        leaves the screen or falls out of the level.
+        """
+        if x < 0 or x + self.width > SCREEN_WIDTH:
+            return None
+        y = bottom - self.height
+        elapsed = 0
+        while elapsed < MAX_ARC_FRAMES:
+            hit = first_contact(x, y, self.width, self.height, vx, vy, GRAVITY,
+                                MAX_ARC_FRAMES - elapsed, self.solids)
+            if hit is None:
+                return None
+            t, i, axis = hit
+            x += vx * t
+            y, vy = fall(y, vy, GRAVITY, t)
+            elapsed += t
+            if axis == "x":
+                return None
+            px, py, pw, ph = self.solids[i]
+            if abs(y + self.height - py) <= abs(y - py - ph):
+                return (i, elapsed) if i < len(self.nodes) else None
+            # Bumped the underside of a platform or the top of the screen.
+            y = py + ph
+            vy = 0
+        return None
+
+# Navigation graphs are cached per level layout, so replaying a level is free.
+_nav_cache = {}
+
+def get_nav_graph(platforms):
+    key = tuple(sorted(tuple(p.rect) for p in platforms))
+    nav = _nav_cache.get(key)
+    if nav is None:
+        nav = NavGraph([p.rect for p in platforms])
+        _nav_cache[key] = nav
+    return nav
+
 # --------------------------
 # LEVEL CREATION
 # --------------------------
-def create_level(level):
-    platforms = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    coins = pygame.sprite.Group()
-    stars = pygame.sprite.Group()
+class LevelPool:
+    """
+    Keeps one level's sprite groups and sprites for the next one, so a level
+    change re-places recycled sprites instead of building new ones. Stomped
+    enemies and collected coins come back too, since they are only out of
+    their groups, not gone.
+    """
+    def __init__(self):
+        self.groups = tuple(pygame.sprite.Group() for _ in range(4))
+        self.pools = {cls: entity_pool.Pool(cls) for cls in (Platform, Enemy, Coin, Star)}
+        self.in_use = []
+
+    def recycle(self):
+        """
+        Returns every sprite handed out so far to the pools and the emptied
+        (platforms, enemies, coins, stars) groups.
+        """
+        for sprite in self.in_use:
+            sprite.kill()
+            self.pools[type(sprite)].release(sprite)
+        self.in_use.clear()
+        return self.groups
+
+    def get(self, cls, *args):
+        sprite = self.pools[cls].acquire(*args)
+        self.in_use.append(sprite)
+        return sprite
+
+def create_level(level, pool=None):
+    """
+    Builds a level's sprites; with a LevelPool the previous level's groups
+    and sprites are reused.
+    """
+    if pool is None:
+        platforms, enemies, coins, stars = (pygame.sprite.Group() for _ in range(4))
+        make = lambda cls, *args: cls(*args)
+    else:
+        platforms, enemies, coins, stars = pool.recycle()
+        make = pool.get
 
     # Ground platform
-    ground = Platform(0, GROUND_Y, SCREEN_WIDTH)
+    ground = make(Platform, 0, GROUND_Y, SCREEN_WIDTH)
     platforms.add(ground)
 
     if level == 1:
-        platforms.add(Platform(200, 450, 150))
-        platforms.add(Platform(400, 350, 150))
-        coins.add(Coin(250, 420), Coin(450, 320))
-        enemies.add(Enemy(300))
-        stars.add(Star(SCREEN_WIDTH - 60, GROUND_Y - 30))
+        platforms.add(make(Platform, 200, 450, 150))
+        platforms.add(make(Platform, 400, 350, 150))
+        coins.add(make(Coin, 250, 420), make(Coin, 450, 320))
+        enemies.add(make(Enemy, 300))
+        stars.add(make(Star, SCREEN_WIDTH - 60, GROUND_Y - 30))
     elif level == 2:
         # Lower floating platforms so they are reachable.
-        platforms.add(Platform(150, 520, 100))   # 60 pixels above ground
-        platforms.add(Platform(350, 460, 100))   # 120 pixels above ground
-        platforms.add(Platform(550, 400, 80))    # 180 pixels above ground
+        platforms.add(make(Platform, 150, 520, 100))   # 60 pixels above ground
+        platforms.add(make(Platform, 350, 460, 100))   # 120 pixels above ground
+        platforms.add(make(Platform, 550, 400, 80))    # 180 pixels above ground
         # Place coins on these platforms (30 pixels above platform top)
-        coins.add(Coin(180, 520 - 30), Coin(380, 460 - 30), Coin(580, 400 - 30))
-        enemies.add(Enemy(200), Enemy(500))
+        coins.add(make(Coin, 180, 520 - 30), make(Coin, 380, 460 - 30), make(Coin, 580, 400 - 30))
+        enemies.add(make(Enemy, 200), make(Enemy, 500))
         # Place the star on the third platform; shift it horizontally to avoid overlap with coin.
-        stars.add(Star(600, 400 - 30))
+        stars.add(make(Star, 600, 400 - 30))
     elif level == 3:
-        platforms.add(Platform(100, 450, 80))
-        platforms.add(Platform(300, 350, 150))
-        platforms.add(Platform(550, 270, 100))
-        coins.add(Coin(110, 420), Coin(350, 320), Coin(580, 240))
-        enemies.add(Enemy(120), Enemy(400), Enemy(600))
-        stars.add(Star(700, 240))
+        platforms.add(make(Platform, 100, 450, 80))
+        platforms.add(make(Platform, 300, 350, 150))
+        platforms.add(make(Platform, 550, 270, 100))
+        coins.add(make(Coin, 110, 420), make(Coin, 350, 320), make(Coin, 580, 240))
+        enemies.add(make(Enemy, 120), make(Enemy, 400), make(Enemy, 600))
+        stars.add(make(Star, 700, 240))
+
+    return platforms, enemies, coins, stars, get_nav_graph(platforms)
+
+# --------------------------
+# GAME STATE
+# --------------------------
+class Game:
+    """
+    One run of the platformer with no window or keyboard attached: main()
+    drives it from the arrow keys, platform_env.py from an agent's actions.
+    """
+    def __init__(self, level=1):
+        self.player = Player(50)
+        self.pool = LevelPool()
+        self.all_sprites = pygame.sprite.Group()
+        self.reset(level)
+
+    def reset(self, level=1):
+        # Starts a new run, reusing this game's sprites.
+        self.player.reset()
+        self.player.respawn()
+        self.level = level
+        self.over = False
+        self.load_level()
+
+    def load_level(self):
+        self.platforms, self.enemies, self.coins, self.stars, self.nav = create_level(self.level, self.pool)
+        self.player_node = None
+        self.all_sprites.empty()
+        self.all_sprites.add(self.platforms, self.enemies, self.coins, self.stars, self.player)
+
+    def won(self):
+        return self.level > LAST_LEVEL
+
+    def step(self, dx=None, dt=1):
+        """
+        Advances the world dt frames with the player moving at dx pixels per
+        frame (None reads the arrow keys). Sets over when the run ends.
+        """
+        player = self.player
+        player.update(self.platforms, self.enemies, dt, dx)
+        # Locate the player once per step; every enemy reuses it.
+        node = self.nav.locate(player.rect)
+        if node is not None:
+            self.player_node = node
+        self.enemies.update(self.platforms, self.nav, player, self.player_node, dt)
+
+        # Collect coins
+        collected = pygame.sprite.spritecollide(player, self.coins, True)
+        for _ in collected:
+            player.coins += 1
+            player.score += 5
+
+        # Collect star to advance level
+        if pygame.sprite.spritecollide(player, self.stars, True):
+            self.level += 1
+            if self.won():
+                self.over = True
+            else:
+                self.load_level()
+                player.respawn()
 
-    return platforms, enemies, coins, stars
+        if player.rect.top >= SCREEN_HEIGHT:
+            player.lives -= 1
+            player.respawn()
+        if player.lives <= 0:
+            self.over = True
 
 # --------------------------
 # MAIN GAME LOOP
@@ -216,11 +775,8 @@ def main():
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 36)
 
-    player = Player(50)
-    level = 1
-    platforms, enemies, coins, stars = create_level(level)
-    all_sprites = pygame.sprite.Group()
-    all_sprites.add(platforms, enemies, coins, stars, player)
+    game = Game()
+    player = game.player
 
     running = True
     while running:
@@ -232,39 +788,17 @@ def main():
                 if event.key == pygame.K_SPACE:
                     player.jump()
 
-        player.update(platforms, enemies)
-        enemies.update()
-
-        # Collect coins
-        collected = pygame.sprite.spritecollide(player, coins, True)
-        for _ in collected:
-            player.coins += 1
-            player.score += 5
-
-        # Collect star to advance level
-        if pygame.sprite.spritecollide(player, stars, True):
-            level += 1
-            if level > 3:
-                running = False
-            else:
-                platforms, enemies, coins, stars = create_level(level)
-                all_sprites.empty()
-                all_sprites.add(platforms, enemies, coins, stars, player)
-                player.respawn()
-
-        if player.rect.top >= SCREEN_HEIGHT:
-            player.lives -= 1
-            player.respawn()
-            if player.lives <= 0:
-                running = False
+        game.step()
+        if game.over:
+            running = False
 
         screen.fill(BLACK)
-        all_sprites.draw(screen)
+        game.all_sprites.draw(screen)
 
         score_surf = font.render(f"Score: {player.score}", True, WHITE)
         lives_surf = font.render(f"Lives: {player.lives}", True, WHITE)
         coins_surf = font.render(f"Coins: {player.coins}", True, WHITE)
-        level_surf = font.render(f"Level: {level}", True, WHITE)
+        level_surf = font.render(f"Level: {game.level}", True, WHITE)
         screen.blit(score_surf, (10, 10))
         screen.blit(lives_surf, (10, 40))
         screen.blit(coins_surf, (10, 70))
@@ -272,8 +806,12 @@ def main():
 
         pygame.display.flip()
 
+    # Only finished runs count; closing the window mid-game does not.
+    if game.over:
+        results_client.submit_result("platformer", player.score)
+
     screen.fill(BLACK)
-    if level > 3:
+    if game.won():
         msg = font.render("Congratulations! You finished all levels!", True, WHITE)
     else:
         msg = font.render(f"Game Over! Final Score: {player.score}", True, WHITE)
@@ -0,0 +1,952 @@
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(ROOT_DIR, "supermario-game.com")
+SOURCE_DIR = os.path.join(ROOT_DIR, "site_src")
+TEMPLATE_DIR = os.path.join(SOURCE_DIR, "templates")
+STRINGS_DIR = os.path.join(SOURCE_DIR, "strings")
+ASSET_DIR = os.path.join(SOURCE_DIR, "assets")
+EXTRAS_FILE = os.path.join(SOURCE_DIR, "page_extras.json")
+CACHE_FILE = os.path.join(SOURCE_DIR, ".build-cache.json")
+IMAGE_MANIFEST = os.path.join(SOURCE_DIR, ".image-manifest.json")
+VENDOR_FILE = os.path.join(SOURCE_DIR, ".vendor.json")  # CDN URL -> local copy, see kiosk_server.py vendor
+
+BASE_LANGUAGE = "en"
+LANGUAGES = ["en", "de", "el", "es", "fr", "it", "nl", "pl", "pt", "ru", "tr", "vi"]
+PAGES = ["index", "contact", "fullscreen", "gameplay", "history", "media"]
+
+# Placeholders look like {{index.title}} or {{url:gameplay}}. Names in the
+# language's string table are translated text; the rest are filled in per page
+# by page_variable().
+SLOT_PATTERN = re.compile(r"\{\{([\w.:-]+)\}\}")
+
+# Flag icon of each language's own pages, where it is not the language code.
+LANGUAGE_FLAGS = {"en": "us", "el": "gr", "pt": "br", "vi": "vn"}
+
+# Patterns used to point pages at the variants written by optimize_images.py.
+IMG_PATTERN = re.compile(r"<img\b[^>]*>")
+SRC_PATTERN = re.compile(r'\ssrc="([^"]+)"')
+WIDTH_PATTERN = re.compile(r'\swidth="(\d+)"')
+URL_PATTERN = re.compile(r"url\((['\"]?)([^'\")]+)\1\)")
+BACKGROUND_WIDTH = 640   # Wallpaper thumbnails are shown in half-width cards
+
+# --------------------------
+# HELPER FUNCTIONS
+# --------------------------
+def output_path(page, lang):
+    """
+    Returns the path (relative to the site directory) of a page in a language.
+    The English home page is index.html, the other home pages are <lang>.html,
+    and every other page lives in a <lang>/ subdirectory.
+    """
+    if page == "index":
+        return "index.html" if lang == BASE_LANGUAGE else f"{lang}.html"
+    if lang == BASE_LANGUAGE:
+        return f"{page}.html"
+    return f"{lang}/{page}.html"
+
+def read_text(path):
+    # newline="" keeps the CRLF line endings of the mirrored pages intact.
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+def digest(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    os.makedirs(SOURCE_DIR, exist_ok=True)
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+def page_variable(name, page, lang, extras=()):
+    """
+    Value of a placeholder that is not translated text, on page in lang:
+      lang, flag          the language code and its flag-icon code
+      lang_path           "" in English, the language code otherwise
+      page_path           the page's path on the live site ("de/contact")
+      root                relative path from the page to the site root
+      url:PAGE[:LANG]     relative link to PAGE in LANG, by default in lang
+      active:LANG         "active" on the LANG pages, "" on the others
+      extra:N             the Nth value kept for this copy of the page alone:
+                          its HTTrack mirror dates, and whitespace or markup
+                          that only some translations have
+    """
+    kind, _, arg = name.partition(":")
+    rel = output_path(page, lang)
+    if kind == "lang":
+        return lang
+    if kind == "flag":
+        return LANGUAGE_FLAGS.get(lang, lang)
+    if kind == "lang_path":
+        return "" if lang == BASE_LANGUAGE else lang
+    if kind == "page_path":
+        path = rel[:-len(".html")]
+        return "" if path == "index" else path
+    if kind == "root":
+        return "../" * rel.count("/")
+    if kind == "url" and arg:
+        target, _, target_lang = arg.partition(":")
+        return posixpath.relpath(output_path(target, target_lang or lang), posixpath.dirname(rel) or ".")
+    if kind == "active" and arg:
+        return "active" if arg == lang else ""
+    if kind == "extra" and arg.isdigit() and int(arg) < len(extras):
+        return extras[int(arg)]
+    raise KeyError(name)
+
+def render(template, strings, page, lang, extras=(), vendor=None):
+    """
+    Fills every {{slot}} in the template: translated text from the strings
+    dict, which may itself hold variables such as links, and everything
+    else from page_variable(). vendor maps CDN URLs to local copies that
+    replace them in the page.
+    """
+    def fill(match):
+        name = match.group(1)
+        if name in strings:
+            return SLOT_PATTERN.sub(fill, strings[name])
+        return page_variable(name, page, lang, extras)
+
+    html = SLOT_PATTERN.sub(fill, template)
+    for url, local in (vendor or {}).items():
+        html = html.replace(url, local)
+    return html
+
+def rewrite_images(html, page_rel, images):
+    """
+    Points <img> tags at their resized variants with a srcset, and CSS
+    background url()s at a thumbnail-sized variant. images is the "images"
+    table of the optimize_images.py manifest; references to anything not in
+    it are left alone.
+    """
+    page_dir = posixpath.dirname(page_rel)
+
+    def lookup(ref):
+        return images.get(posixpath.normpath(posixpath.join(page_dir, ref)))
+
+    def relative(path):
+        return posixpath.relpath(path, page_dir or ".")
+
+    def replace_img(match):
+        tag = match.group(0)
+        src = SRC_PATTERN.search(tag)
+        entry = lookup(src.group(1)) if src and "srcset=" not in tag else None
+        if entry is None:
+            return tag
+        variants = entry["variants"]
+        srcset = ", ".join(f"{relative(v['path'])} {v['width']}w" for v in variants)
+        width = WIDTH_PATTERN.search(tag)
+        if width:
+            sizes = f"{width.group(1)}px"
+        else:
+            sizes = f"(max-width: {entry['width']}px) 100vw, {entry['width']}px"
+        new_src = f' src="{relative(variants[-1]["path"])}" srcset="{srcset}" sizes="{sizes}"'
+        return tag[:src.start()] + new_src + tag[src.end():]
+
+    def replace_url(match):
+        entry = lookup(match.group(2))
+        if entry is None:
+            return match.group(0)
+        variants = entry["variants"]
+        best = next((v for v in variants if v["width"] >= BACKGROUND_WIDTH), variants[-1])
+        return f"url({match.group(1)}{relative(best['path'])}{match.group(1)})"
+
+    html = IMG_PATTERN.sub(replace_img, html)
+    return URL_PATTERN.sub(replace_url, html)
+
+def load_images():
+    """
+    Returns (images, digest) from the optimize_images.py manifest, or ({}, "")
+    when no variants have been generated.
+    """
+    try:
+        text = read_text(IMAGE_MANIFEST)
+    except OSError:
+        return {}, ""
+    return json.loads(text).get("images", {}), digest(text)
+
+def load_vendor():
+    """
+    Returns (mapping, digest) from the VENDOR_FILE written by kiosk_server.py
+    vendor, or ({}, "") when the CDN libraries have not been vendored.
+    """
+    try:
+        text = read_text(VENDOR_FILE)
+    except OSError:
+        return {}, ""
+    return json.loads(text), digest(text)
+
+# --------------------------
+# BUILD
+# --------------------------
+def render_language(lang, jobs, site_dir, images, vendor):
+    """
+    Worker entry point: renders and writes every stale page of one language.
+    jobs is a list of (page, template, strings, extras) tuples.
+    """
+    written = []
+    for page, template, strings, extras in jobs:
+        rel = output_path(page, lang)
+        html = render(template, strings, page, lang, extras, vendor)
+        if images:
+            html = rewrite_images(html, rel, images)
+        write_text(os.path.join(site_dir, rel), html)
+        written.append(rel)
+    return written
+
+def copy_assets(site_dir, cache, force):
+    """
+    Mirrors site_src/assets into the site directory, copying only files whose
+    content changed since the last build.
+    """
+    copied = []
+    if not os.path.isdir(ASSET_DIR):
+        return copied
+    asset_cache = cache.setdefault("assets", {})
+    for dirpath, _, filenames in os.walk(ASSET_DIR):
+        for name in filenames:
+            src = os.path.join(dirpath, name)
+            rel = os.path.relpath(src, ASSET_DIR).replace(os.sep, "/")
+            dst = os.path.join(site_dir, rel)
+            key = file_digest(src)
+            if not force and asset_cache.get(rel) == key and os.path.exists(dst):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(src, dst)
+            asset_cache[rel] = key
+            copied.append(rel)
+    return copied
+
+def build(site_dir=SITE_DIR, force=False, workers=None):
+    """
+    Renders every (page, language) pair whose template, strings or image
+    manifest changed since the last build, plus any changed shared assets.
+    Returns the list of written paths.
+    """
+    # One cache per output directory: a build elsewhere says nothing about
+    # what this directory holds.
+    sites = load_cache().get("sites", {})
+    cache = sites.setdefault(os.path.abspath(site_dir), {})
+    if force:
+        cache.clear()
+    page_cache = cache.setdefault("pages", {})
+
+    templates = {page: read_text(os.path.join(TEMPLATE_DIR, f"{page}.html")) for page in PAGES}
+    slots = {page: set(SLOT_PATTERN.findall(text)) for page, text in templates.items()}
+    images, images_key = load_images()
+    vendor, vendor_key = load_vendor()
+    template_keys = {page: digest(text + images_key + vendor_key) for page, text in templates.items()}
+    with open(EXTRAS_FILE, encoding="utf-8") as f:
+        page_extras = json.load(f)
+
+    stale = {}
+    fingerprints = {}
+    for lang in LANGUAGES:
+        with open(os.path.join(STRINGS_DIR, f"{lang}.json"), encoding="utf-8") as f:
+            table = json.load(f)
+        for page in PAGES:
+            # Only the strings this page uses, so editing one page's text
+            # leaves the others cached.
+            strings = {name: table[name] for name in slots[page] if name in table}
+            rel = output_path(page, lang)
+            extras = page_extras.get(rel, [])
+            key = digest(template_keys[page] + json.dumps([strings, extras], sort_keys=True))
+            fingerprints[rel] = key
+            if force or page_cache.get(rel) != key or not os.path.exists(os.path.join(site_dir, rel)):
+                stale.setdefault(lang, []).append((page, templates[page], strings, extras))
+
+    written = copy_assets(site_dir, cache, force)
+    if stale:
+        if len(stale) == 1 or workers == 1:
+            results = [render_language(lang, jobs, site_dir, images, vendor) for lang, jobs in stale.items()]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(render_language, lang, jobs, site_dir, images, vendor)
+                           for lang, jobs in stale.items()]
+                results = [future.result() for future in futures]
+        for paths in results:
+            for rel in paths:
+                page_cache[rel] = fingerprints[rel]
+                written.append(rel)
+
+    save_cache({"sites": sites})
+    return written
+
+# --------------------------
+# EXTRACTION
+# --------------------------
+# Pages are split into tags, script and style bodies, and runs of text. Inline
+# tags stay inside a run, so a sentence with <b> or a link in it is translated
+# as one string.
+CODE_PATTERN = re.compile(r"(<(script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+TOKEN_PATTERN = re.compile(r"<[^>]*>|<|[^<]+")
+TAG_NAME_PATTERN = re.compile(r"</?(!--|[A-Za-z][\w-]*)")
+QUOTED_PATTERN = re.compile(r'("[^"]*")')
+ATTR_NAME_PATTERN = re.compile(r"([\w:-]+)\s*=\s*$")
+CSS_URL_PATTERN = re.compile(r"(url\(['\"]?)(?!['\"]|[a-z]+:|/|#)")
+LINK_PATTERN = re.compile(r'(\b(?:href|src)=")([^"]*)(")')
+MIRROR_PATTERN = re.compile(r"(<!-- Mirrored from supermario-game\.com/)(\S*)( by HTTrack .*?, )(.*?)( -->)")
+INLINE_TAGS = {"a", "b", "strong", "i", "em", "u", "small", "sup", "sub", "br", "img"}
+# Opening one of these ends an open <p>, as browsers do.
+CLOSES_P = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "center", "table", "blockquote", "pre"}
+VOID_TAGS = {"br", "meta", "link", "img", "input", "hr", "source", "area", "base", "col", "embed", "wbr"}
+TRANSLATED_ATTRIBUTES = {"content", "alt", "title", "placeholder", "aria-label"}
+NAMED_META = {"title", "description", "keywords"}
+# Parts of every page whose text is keyed by the part rather than the page.
+LANDMARKS = {"nav", "footer"}
+
+def _is_tag(piece):
+    return len(piece) > 1 and piece.startswith("<") and piece.endswith(">")
+
+def _tag_name(piece):
+    match = TAG_NAME_PATTERN.match(piece)
+    return match.group(1).lower() if match else None
+
+def _partners(pieces):
+    # Index of each inline tag's opening or closing partner, None if unmatched.
+    partner = [None] * len(pieces)
+    open_tags = []
+    for i, piece in enumerate(pieces):
+        if not _is_tag(piece):
+            continue
+        name = _tag_name(piece)
+        if piece.startswith("</"):
+            for j in range(len(open_tags) - 1, -1, -1):
+                if _tag_name(pieces[open_tags[j]]) == name:
+                    partner[i], partner[open_tags[j]] = open_tags[j], i
+                    del open_tags[j:]
+                    break
+        elif name not in VOID_TAGS and not piece.endswith("/>"):
+            open_tags.append(i)
+    return partner
+
+def _split_run(pieces):
+    """
+    Splits a run of text and inline tags into (kind, str) tokens: the text in
+    the middle, and the whitespace, unmatched tags and wrapping tags around
+    it, which belong to the template.
+    """
+    if not any(not _is_tag(piece) and piece.strip() for piece in pieces):
+        return [("tag" if _is_tag(piece) else "space", piece) for piece in pieces]
+    head, tail = [], []
+    while True:
+        first, last = pieces[0], pieces[-1]
+        if not _is_tag(first) and first != first.lstrip():
+            text = first.lstrip()
+            head.append(("space", first[:len(first) - len(text)]))
+            pieces[0:1] = [text] if text else []
+            continue
+        if not _is_tag(last) and last != last.rstrip():
+            text = last.rstrip()
+            tail.append(("space", last[len(text):]))
+            pieces[-1:] = [text] if text else []
+            continue
+        partner = _partners(pieces)
+        if _is_tag(first) and partner[0] == len(pieces) - 1:
+            head.append(("tag", first))
+            tail.append(("tag", last))
+            pieces = pieces[1:-1]
+        elif _is_tag(first) and partner[0] is None:
+            head.append(("tag", pieces.pop(0)))
+        elif _is_tag(last) and partner[-1] is None:
+            tail.append(("tag", pieces.pop()))
+        else:
+            break
+    return head + [("text", "".join(pieces))] + tail[::-1]
+
+def _tokenize_markup(html):
+    tokens = []
+    run = []
+    for piece in TOKEN_PATTERN.findall(html):
+        if not _is_tag(piece) or _tag_name(piece) in INLINE_TAGS:
+            run.append(piece)
+            continue
+        if run:
+            tokens.extend(_split_run(run))
+            run = []
+        tokens.append(("tag", piece))
+    if run:
+        tokens.extend(_split_run(run))
+    return tokens
+
+def _tokenize(html):
+    tokens = []
+    pos = 0
+    for match in CODE_PATTERN.finditer(html):
+        tokens.extend(_tokenize_markup(html[pos:match.start()]))
+        tokens.append(("tag", match.group(1)))
+        if match.group(3):
+            tokens.append(("code", match.group(3)))
+        tokens.append(("tag", match.group(4)))
+        pos = match.end()
+    tokens.extend(_tokenize_markup(html[pos:]))
+    return tokens
+
+def _structure(token):
+    # What a token is as far as lining up the copies of a page goes: for
+    # tags their name and attribute names, for text the numbers and tags
+    # in it, which translations keep.
+    kind, text = token
+    if kind == "tag":
+        attrs = (ATTR_NAME_PATTERN.search(part) for part in QUOTED_PATTERN.split(text)[:-1:2])
+        return kind, text.startswith("</"), _tag_name(text) or text, tuple(m.group(1) for m in attrs if m)
+    if kind == "text":
+        return kind, tuple(re.findall(r"\d+|<[^\s>]+", text))
+    return kind, text if kind == "code" else ""
+
+def _units(tokens):
+    # [(whitespace before, token)] for every token that is not whitespace,
+    # and the whitespace after the last one.
+    units = []
+    gap = ""
+    for kind, text in tokens:
+        if kind == "space":
+            gap += text
+        else:
+            units.append((gap, (kind, text)))
+            gap = ""
+    return units, gap
+
+def _compatible(tokens):
+    kind = tokens[0][0]
+    if any(k != kind for k, _ in tokens):
+        return False
+    return kind != "tag" or len({_tag_name(text) for _, text in tokens}) == 1
+
+def _aligned(rows):
+    # Whether every language has the same tokens, whitespace aside, up to
+    # attribute values and the text itself.
+    size = len(rows[BASE_LANGUAGE])
+    return (all(len(row) == size for row in rows.values())
+            and all(_compatible([row[i][1] for row in rows.values()]) for i in range(size)))
+
+def _has_text(rows):
+    return any(kind == "text" for row in rows.values() for _, (kind, _) in row)
+
+def _element_tags(tokens):
+    # (index, name, closing) for the tags that open or close a block-level
+    # element; inline tags belong to the text around them.
+    for i, (kind, text) in enumerate(tokens):
+        name = _tag_name(text) if kind == "tag" else None
+        if (name is None or name.startswith("!") or name in VOID_TAGS or name in INLINE_TAGS
+                or text.endswith("/>")):
+            continue
+        yield i, name, text.startswith("</")
+
+def _elements(tokens):
+    # (open, close) index pairs of the elements in a token list, tolerating
+    # the unclosed and stray tags of real pages. A <p> ended implicitly
+    # closes just before the tag that ends it.
+    pairs = []
+    stack = []
+    for i, name, closing in _element_tags(tokens):
+        if closing:
+            for j in range(len(stack) - 1, -1, -1):
+                if stack[j][0] == name:
+                    pairs.append((stack[j][1], i))
+                    del stack[j:]
+                    break
+            continue
+        if name in CLOSES_P and stack and stack[-1][0] == "p":
+            pairs.append((stack.pop()[1], i - 1))
+        stack.append((name, i))
+    return pairs
+
+def _balanced(tokens, names):
+    # Whether a token list closes every element it opens and nothing else,
+    # counting only elements named in names.
+    stack = []
+    for _, name, closing in _element_tags(tokens):
+        if name not in names:
+            continue
+        if stack and stack[-1] == "p" and name in CLOSES_P and (name != "p" or not closing):
+            stack.pop()
+        if not closing:
+            stack.append(name)
+        elif stack and stack[-1] == name:
+            stack.pop()
+        elif name != "p":     # a stray </p> is an empty paragraph
+            return False
+    return all(name == "p" for name in stack)     # closed by whatever follows
+
+def _widen(elements, start, end):
+    """
+    The token range [start, end) grown within the innermost element around
+    it: to whole children of that element if it cuts through any, else by
+    the child next to it, else to the element's whole content, and from
+    there to the element itself.
+    """
+    around = [(o, c) for o, c in elements if o < start and c >= end]
+    if not around:
+        return start, end
+    outer = max(around)
+    inner = [(o, c) for o, c in elements if outer[0] < o and c < outer[1]]
+    children = [(o, c) for o, c in inner if not any(p < o and c < q for p, q in inner)]
+    touched = [(o, c) for o, c in children if o < end and c >= start]
+    if touched:
+        widened = min(start, min(touched)[0]), max(end, max(c for _, c in touched) + 1)
+        if widened != (start, end):
+            return widened
+    before = [(o, c) for o, c in children if c < start]
+    if before:
+        return before[-1][0], end
+    after = [(o, c) for o, c in children if o >= end]
+    if after:
+        return start, min(after)[1] + 1
+    if (start, end) != (outer[0] + 1, outer[1]):
+        return outer[0] + 1, outer[1]
+    return outer[0], outer[1] + 1
+
+def _slug(text):
+    text = re.sub(r"&copy;|\u00a9", " copyright ", text)
+    text = re.sub(r"<[^>]*>|&\w+;|\{\{[^}]*\}\}", " ", text)
+    return "_".join(re.findall(r"[a-z0-9]+", text.lower())[:4]) or "text"
+
+# Reverse of output_path(), for recognising links between pages.
+PAGE_FILES = {output_path(page, lang): (page, lang) for page in PAGES for lang in LANGUAGES}
+
+class PageExtraction:
+    """
+    Splits the localized copies of one page into a template, the text that
+    is translated (messages) and the values kept per copy (extras).
+
+    Every language is lined up against English by the structure of its
+    tokens. Where the copies differ, tags are rewritten with page_variable()
+    placeholders when that reproduces every language (links, language codes,
+    the active flag) and runs of text become messages. Whitespace, scripts
+    and markup that only some copies have are kept as extras. Only where
+    translations differ in the markup around their text does that markup go
+    into the message.
+    """
+    def __init__(self, page, site_dir):
+        self.page = page
+        self.tokens = {lang: _tokenize(read_text(os.path.join(site_dir, output_path(page, lang))))
+                       for lang in LANGUAGES}
+        self.messages = []    # [(section, hint, {lang: text})], referenced as {{n}} in the template
+        self.extras = {lang: [] for lang in LANGUAGES}
+        self.template = []
+        self.context = None   # last opening tag written, for naming messages
+        self.landmark = None  # LANDMARKS element being written, if any
+        self.extract()
+
+    def extract(self):
+        base = self.tokens[BASE_LANGUAGE]
+        opcodes = {}
+        ranges = []
+        # Copies are matched up by their structure alone: whitespace, text and
+        # attribute values that differ are sorted out by equal() afterwards.
+        keys = {lang: [_structure(token) for token in tokens] for lang, tokens in self.tokens.items()}
+        for lang in LANGUAGES:
+            matcher = difflib.SequenceMatcher(None, keys[BASE_LANGUAGE], keys[lang], autojunk=False)
+            opcodes[lang] = matcher.get_opcodes()
+            ranges.extend((i1, i2) for tag, i1, i2, _, _ in opcodes[lang] if tag != "equal")
+
+        def blocks(start, end):
+            return {lang: self.tokens[lang][_map_start(opcodes[lang], start):_map_end(opcodes[lang], end)]
+                    for lang in LANGUAGES}
+
+        def between(start, end):
+            # The shared stretch between two blocks, leaving insertions to them.
+            return {lang: self.tokens[lang][_map_end(opcodes[lang], start):_map_start(opcodes[lang], end)]
+                    for lang in LANGUAGES}
+
+        # Text whose translations differ in structure (paragraphs split or
+        # merged, stray tags) cannot be matched up piece by piece, so it is
+        # widened until every copy is whole elements with English text in
+        # them, and kept as one message.
+        elements = _elements(base)
+        names = {name for _, name, _ in _element_tags(base)}
+        while True:
+            merged = []
+            for start, end in sorted(ranges):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            ranges = []
+            for start, end in merged:
+                copies = blocks(start, end)
+                rows = {lang: _units(tokens)[0] for lang, tokens in copies.items()}
+                whole = (_has_text({BASE_LANGUAGE: rows[BASE_LANGUAGE]})
+                         and not any(start <= o < end <= c or o < start <= c < end for o, c in elements)
+                         and all(_balanced(tokens, names) for tokens in copies.values()))
+                if not _aligned(rows) and _has_text(rows) and not whole:
+                    start, end = _widen(elements, start, end)
+                ranges.append((start, end))
+            if len(ranges) == len(merged) and all(tuple(m) == r for m, r in zip(merged, ranges)):
+                break
+
+        pos = 0
+        for start, end in merged:
+            self.equal(between(pos, start))
+            self.block(blocks(start, end))
+            pos = end
+        self.equal(between(pos, len(base)))
+
+    def equal(self, blocks):
+        # A stretch where every copy has the same structure.
+        for i, (kind, _) in enumerate(blocks[BASE_LANGUAGE]):
+            column = {lang: tokens[i] for lang, tokens in blocks.items()}
+            if kind == "space":
+                self.gap({lang: text for lang, (_, text) in column.items()})
+            else:
+                self.token(column)
+
+    def literal(self, kind, text):
+        if kind == "tag":
+            self.enter(text)
+        self.template.append(text)
+
+    def enter(self, tag):
+        name = _tag_name(tag)
+        if not tag.startswith("</"):
+            self.context = tag
+            if name in LANDMARKS:
+                self.landmark = name
+        elif name == self.landmark:
+            self.landmark = None
+
+    def block(self, blocks):
+        """
+        Emits a stretch where the languages differ. Where the copies line up
+        apart from whitespace it goes token by token; otherwise text goes
+        into one message as a whole, and markup without text is split into
+        the tokens the copies share at either end and an extra between them.
+        """
+        units = {lang: _units(tokens) for lang, tokens in blocks.items()}
+        rows = {lang: u for lang, (u, _) in units.items()}
+        size = min(len(row) for row in rows.values())
+
+        def column(i):
+            return {lang: row[i] for lang, row in rows.items()}
+
+        def compatible(i):
+            return _compatible([token for _, token in column(i).values()])
+
+        head = tail = 0
+        if _aligned(rows):
+            head = size
+        elif not _has_text(rows):
+            while head < size and compatible(head):
+                head += 1
+            while head + tail < size and compatible(-1 - tail):
+                tail += 1
+
+        for i in range(head):
+            self.unit(column(i))
+        middle = {lang: row[head:len(row) - tail] for lang, row in rows.items()}
+        if any(middle.values()):
+            joined = {lang: "".join(gap + text for gap, (_, text) in row) for lang, row in middle.items()}
+            core = {lang: text.lstrip() for lang, text in joined.items()}
+            self.gap({lang: joined[lang][:len(joined[lang]) - len(core[lang])] for lang in LANGUAGES})
+            if any(kind == "text" for row in middle.values() for _, (kind, _) in row):
+                self.template.append(self.message(core))
+            else:
+                self.template.append(self.extra(core))
+        for i in range(tail, 0, -1):
+            self.unit(column(-i))
+        self.gap({lang: gap for lang, (_, gap) in units.items()})
+
+    def unit(self, units):
+        self.gap({lang: gap for lang, (gap, _) in units.items()})
+        self.token({lang: token for lang, (_, token) in units.items()})
+
+    def gap(self, gaps):
+        if len(set(gaps.values())) == 1:
+            self.template.append(gaps[BASE_LANGUAGE])
+        else:
+            self.template.append(self.extra(gaps))
+
+    def token(self, tokens):
+        texts = {lang: text for lang, (_, text) in tokens.items()}
+        kind = tokens[BASE_LANGUAGE][0]
+        if len(set(texts.values())) == 1:
+            self.literal(kind, texts[BASE_LANGUAGE])
+        elif kind == "text":
+            self.template.append(self.message(texts))
+        else:
+            recorded = len(self.messages), len(self.extras[BASE_LANGUAGE])
+            generalized = self.tag(texts) if kind == "tag" else self.code(texts)
+            if generalized is None:
+                # Drop whatever the failed attempt recorded.
+                del self.messages[recorded[0]:]
+                for values in self.extras.values():
+                    del values[recorded[1]:]
+                generalized = self.extra(texts)
+            elif kind == "tag":
+                self.enter(generalized)
+            self.template.append(generalized)
+
+    def extra(self, values):
+        n = len(self.extras[BASE_LANGUAGE])
+        for lang, value in values.items():
+            self.extras[lang].append(value)
+        return f"{{{{extra:{n}}}}}"
+
+    def tag(self, texts):
+        """
+        Rewrites a tag that differs between languages so one template
+        reproduces all of them, or returns None if that is not possible.
+        """
+        mirrors = {lang: MIRROR_PATTERN.fullmatch(text) for lang, text in texts.items()}
+        if all(mirrors.values()):
+            if any(m.group(2) != page_variable("page_path", self.page, lang) for lang, m in mirrors.items()):
+                return None
+            m = mirrors[BASE_LANGUAGE]
+            date = self.extra({lang: m.group(4) for lang, m in mirrors.items()})
+            return f"{m.group(1)}{{{{page_path}}}}{m.group(3)}{date}{m.group(5)}"
+
+        parts = {lang: QUOTED_PATTERN.split(text) for lang, text in texts.items()}
+        base = parts[BASE_LANGUAGE]
+        if any(len(p) != len(base) for p in parts.values()):
+            return None
+        out = []
+        for i, part in enumerate(base):
+            if len({p[i] for p in parts.values()}) == 1:
+                out.append(part)
+                continue
+            if i % 2 == 0:
+                # Markup that differs only in its line endings keeps them as extras.
+                lines = {lang: re.split(r"(\r?\n)", p[i]) for lang, p in parts.items()}
+                if any(l[::2] != lines[BASE_LANGUAGE][::2] for l in lines.values()):
+                    return None
+                for j, piece in enumerate(lines[BASE_LANGUAGE]):
+                    ends = {lang: l[j] for lang, l in lines.items()}
+                    out.append(piece if len(set(ends.values())) == 1 else self.extra(ends))
+                continue
+            values = {lang: p[i][1:-1] for lang, p in parts.items()}
+            attr = ATTR_NAME_PATTERN.search(base[i - 1])
+            value = self.value(values, attr.group(1).lower() if attr else None, base)
+            if value is None:
+                return None
+            out.append(f'"{value}"')
+        return "".join(out)
+
+    def value(self, values, attr, parts):
+        link = self.link(values)
+        if link is not None:
+            return link
+
+        # A shared prefix and suffix around a part that follows the language.
+        prefix = os.path.commonprefix(list(values.values()))
+        suffix = os.path.commonprefix([v[len(prefix):][::-1] for v in values.values()])[::-1]
+        middles = {lang: v[len(prefix):len(v) - len(suffix)] for lang, v in values.items()}
+        candidates = ["lang", "lang_path", "flag", "page_path", "root"]
+        candidates += [f"active:{lang}" for lang, middle in middles.items() if middle == "active"]
+        for name in candidates:
+            if all(page_variable(name, self.page, lang) == middle for lang, middle in middles.items()):
+                return f"{prefix}{{{{{name}}}}}{suffix}"
+
+        if attr in TRANSLATED_ATTRIBUTES:
+            meta = re.search(r'\bname="([^"]*)"', "".join(parts))
+            hint = meta.group(1) if meta and meta.group(1) in NAMED_META else None
+            return self.message(values, hint)
+        return None
+
+    def code(self, texts):
+        """
+        A script or stylesheet whose copies differ only in how far their
+        relative url()s climb back to the site root, or None.
+        """
+        base = texts[BASE_LANGUAGE]
+        root = page_variable("root", self.page, BASE_LANGUAGE)
+        if SLOT_PATTERN.search(base) or not CSS_URL_PATTERN.search(base):
+            return None
+        template = re.sub(CSS_URL_PATTERN.pattern + re.escape(root), r"\1{{root}}", base)
+        if all(template.replace("{{root}}", page_variable("root", self.page, lang)) == text
+               for lang, text in texts.items()):
+            return template
+        return None
+
+    def link(self, values):
+        """
+        Returns {{url:PAGE}} when every copy links to PAGE in its own
+        language, {{url:PAGE:LANG}} when they all link to the same copy, and
+        None for anything else.
+        """
+        targets = {}
+        for lang, value in values.items():
+            path, sep, rest = value.partition("?") if "?" in value else value.partition("#")
+            rel = posixpath.normpath(posixpath.join(posixpath.dirname(output_path(self.page, lang)), path))
+            if ":" in path or rel not in PAGE_FILES:
+                return None
+            targets[lang] = (PAGE_FILES[rel], sep + rest)
+        (page, _), rest = targets[BASE_LANGUAGE]
+        if any(suffix != rest or target[0] != page for target, suffix in targets.values()):
+            return None
+        if all(target_lang == lang for lang, ((_, target_lang), _) in targets.items()):
+            return f"{{{{url:{page}}}}}{rest}"
+        fixed = {target_lang for (_, target_lang), _ in targets.values()}
+        if len(fixed) == 1:
+            return f"{{{{url:{page}:{fixed.pop()}}}}}{rest}"
+        return None
+
+    def message(self, texts, hint=None):
+        """
+        Records translated text and returns its placeholder. Links inside the
+        text are rewritten as placeholders, so the same text fits pages at
+        any depth.
+        """
+        if hint is None and self.context and _tag_name(self.context) == "title":
+            hint = "title"
+        texts = {lang: LINK_PATTERN.sub(lambda m: m.group(1) + self.local_link(m.group(2), lang) + m.group(3), text)
+                 for lang, text in texts.items()}
+        self.messages.append((self.landmark, hint, texts))
+        return f"{{{{{len(self.messages) - 1}}}}}"
+
+    def local_link(self, value, lang):
+        if not value or ":" in value or value.startswith(("/", "#", "{")):
+            return value
+        path, sep, rest = value.partition("?") if "?" in value else value.partition("#")
+        rel = posixpath.normpath(posixpath.join(posixpath.dirname(output_path(self.page, lang)), path))
+        if rel in PAGE_FILES:
+            page, target_lang = PAGE_FILES[rel]
+            name = f"url:{page}" if target_lang == lang else f"url:{page}:{target_lang}"
+            return f"{{{{{name}}}}}{sep}{rest}"
+        if page_variable("root", self.page, lang) + rel == path:
+            return "{{root}}" + rel + sep + rest
+        return value
+
+def _map_start(opcodes, pos):
+    # First matching opcode, so an insertion at pos belongs to the block that starts there.
+    for tag, i1, i2, j1, j2 in opcodes:
+        if i1 <= pos <= i2:
+            if tag == "equal":
+                return j1 + pos - i1
+            if pos == i1:
+                return j1
+            if pos == i2:
+                return j2
+    raise ValueError(f"token {pos} falls inside a changed block")
+
+def _map_end(opcodes, pos):
+    # Last matching opcode, so an insertion at pos belongs to the block that ends there.
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if i1 <= pos <= i2:
+            if tag == "equal":
+                return j1 + pos - i1
+            if pos == i2:
+                return j2
+            if pos == i1:
+                return j1
+    raise ValueError(f"token {pos} falls inside a changed block")
+
+def extract(site_dir=SITE_DIR):
+    """
+    Regenerates site_src/templates, site_src/strings and site_src/page_extras.json
+    from the pages currently in the site directory, and checks that they
+    render back to the exact same files.
+
+    Strings are keyed "<page>.<first words of the English text>" (or
+    "<page>.title" and "<page>.description"); text in the menu and footer
+    goes under "nav." and "footer.", and other text that several pages share
+    word for word in every language is kept once under "common.".
+    """
+    extractions = [PageExtraction(page, site_dir) for page in PAGES]
+    pages_using = {}
+    for extraction in extractions:
+        for _, _, texts in extraction.messages:
+            pages_using.setdefault(tuple(texts[lang] for lang in LANGUAGES), set()).add(extraction.page)
+
+    keys = {}
+    names = []
+    tables = {lang: {} for lang in LANGUAGES}
+    extras = {}
+    for extraction in extractions:
+        page = extraction.page
+        slots = []
+        for landmark, hint, texts in extraction.messages:
+            row = tuple(texts[lang] for lang in LANGUAGES)
+            section = landmark or ("common" if len(pages_using[row]) > 1 else page)
+            if (section, row) not in keys:
+                stem = f"{section}.{hint or _slug(texts[BASE_LANGUAGE])}"
+                name, n = stem, 2
+                while name in names:
+                    name, n = f"{stem}_{n}", n + 1
+                keys[section, row] = name
+                names.append(name)
+                for lang in LANGUAGES:
+                    tables[lang][name] = texts[lang]
+            slots.append(keys[section, row])
+        template = SLOT_PATTERN.sub(lambda m: "{{" + slots[int(m.group(1))] + "}}" if m.group(1).isdigit()
+                                    else m.group(0), "".join(extraction.template))
+        write_text(os.path.join(TEMPLATE_DIR, f"{page}.html"), template)
+
+        for lang in LANGUAGES:
+            rel = output_path(page, lang)
+            extras[rel] = extraction.extras[lang]
+            original = read_text(os.path.join(site_dir, rel))
+            if render(template, tables[lang], page, lang, extras[rel]) != original:
+                raise RuntimeError(f"{rel} does not round-trip")
+        print(f"{page}: {len(set(slots))} strings")
+
+    # Shared strings first, then each page's in page order.
+    sections = ["common", *sorted(LANDMARKS, reverse=True), *PAGES]
+    order = sorted(names, key=lambda name: sections.index(name.partition(".")[0]))
+    os.makedirs(STRINGS_DIR, exist_ok=True)
+    for lang, table in tables.items():
+        with open(os.path.join(STRINGS_DIR, f"{lang}.json"), "w", encoding="utf-8") as f:
+            json.dump({name: table[name] for name in order}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    with open(EXTRAS_FILE, "w", encoding="utf-8") as f:
+        json.dump(extras, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+# --------------------------
+# MAIN
+# --------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build the localized supermario-game.com pages.")
+    parser.add_argument("command", nargs="?", default="build", choices=["build", "extract"],
+                        help="build the site (default) or re-extract templates from the site")
+    parser.add_argument("--force", action="store_true", help="rebuild every page")
+    parser.add_argument("--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--out", default=SITE_DIR, help="output directory")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        extract(args.out)
+        return
+
+    start = time.perf_counter()
+    written = build(args.out, force=args.force, workers=args.jobs)
+    elapsed = time.perf_counter() - start
+    for rel in written:
+        print(f"  wrote {rel}")
+    print(f"{len(written)} file(s) written in {elapsed:.3f} s")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+# --------------------------
+# OBJECT POOL
+# --------------------------
+class Pool:
+    """
+    Free list of reusable game objects. acquire(*args) hands back a released
+    object re-initialised with its reset(*args), or builds a new one with
+    factory(*args) when none is free. Objects should do their setup in
+    reset() so both paths leave them in the same state.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+    def release_all(self, objs):
+        self.free.extend(objs)
+
+    def __len__(self):
+        return len(self.free)
@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import re
+import statistics
+import sys
+import time
+from urllib.parse import urljoin, urlsplit
+
+import kiosk_server
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+KIOSKS = 30
+DURATION = 10.0                      # Seconds each kiosk keeps loading pages
+PAGES = ["/index.html", "/de.html", "/media.html", "/fr/gameplay.html", "/mario-game/mario.html"]
+
+# Local src/href references a browser would fetch when loading a page.
+ASSET_PATTERN = re.compile(r'(?:src|href)="([^"#?]+)')
+
+# --------------------------
+# MINIMAL HTTP CLIENT
+# --------------------------
+class Connection:
+    """
+    One keep-alive HTTP/1.1 connection, like a single browser socket.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}", "Accept-Encoding: gzip"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ")[1])
+        response_headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(response_headers.get("content-length", "0")))
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, response_headers, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+        self.reader = self.writer = None
+
+# --------------------------
+# KIOSK SIMULATION
+# --------------------------
+async def discover_assets(host, port, pages):
+    """
+    Fetches each page once (uncompressed) and lists the local files it
+    references. References the server cannot find are left out.
+    """
+    conn = Connection(host, port)
+    assets = {}
+    for page in pages:
+        status, _, body = await conn.request(page, {"Accept-Encoding": "identity"})
+        refs = []
+        if status == 200:
+            for ref in ASSET_PATTERN.findall(body.decode("utf-8", "replace")):
+                if urlsplit(ref).scheme:
+                    continue
+                url = urljoin(page, ref)
+                if url not in refs and not url.endswith(".html"):
+                    refs.append(url)
+        found = []
+        for url in refs:
+            status, _, _ = await conn.request(url, {"Accept-Encoding": "identity"})
+            if status == 200:
+                found.append(url)
+        assets[page] = found
+    await conn.close()
+    return assets
+
+async def kiosk(host, port, pages, assets, deadline, latencies, statuses, revalidate):
+    """
+    Loads pages in a loop over six connections, like a browser. With
+    revalidate set it behaves like a warm browser cache and sends
+    If-None-Match for anything it has seen before.
+    """
+    conns = [Connection(host, port) for _ in range(6)]
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        page = pages[i % len(pages)]
+        i += 1
+        urls = [page] + assets[page]
+        for start in range(0, len(urls), len(conns)):
+            batch = urls[start:start + len(conns)]
+            results = await asyncio.gather(*(fetch(conn, url, etags if revalidate else {})
+                                             for conn, url in zip(conns, batch)))
+            for status, elapsed in results:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+    for conn in conns:
+        await conn.close()
+
+async def fetch(conn, url, etags):
+    headers = {}
+    if url in etags:
+        headers["If-None-Match"] = etags[url]
+    start = time.perf_counter()
+    status, response_headers, _ = await conn.request(url, headers)
+    elapsed = time.perf_counter() - start
+    if "etag" in response_headers:
+        etags[url] = response_headers["etag"]
+    return status, elapsed
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run(kiosks, duration, host, port, revalidate):
+    server = None
+    if port is None:
+        # No server given: start one in this process on a free port.
+        server = await kiosk_server.KioskServer().start("127.0.0.1", 0)
+        host, port = "127.0.0.1", server.sockets[0].getsockname()[1]
+
+    assets = await discover_assets(host, port, PAGES)
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(kiosk(host, port, PAGES, assets, deadline, latencies, statuses, revalidate)
+                           for _ in range(kiosks)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        # Let the server's handlers notice the closed connections before shutting down.
+        await asyncio.sleep(0.1)
+        server.close()
+        await server.wait_closed()
+
+    print(f"{kiosks} kiosks, {len(latencies)} requests in {elapsed:.1f} s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print("status counts: " + ", ".join(f"{code}={n}" for code, n in sorted(statuses.items())))
+    for pct in (50, 90, 95, 99):
+        print(f"  p{pct}: {percentile(latencies, pct) * 1000:.2f} ms")
+    print(f"  max: {max(latencies) * 1000:.2f} ms   mean: {statistics.mean(latencies) * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a room of kiosks against the kiosk server.")
+    parser.add_argument("--kiosks", type=int, default=KIOSKS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None,
+                        help="port of a running server (default: start one in-process)")
+    parser.add_argument("--cold", action="store_true",
+                        help="always download full responses instead of revalidating")
+    args = parser.parse_args()
+    asyncio.run(run(args.kiosks, args.duration, args.host, args.port, not args.cold))
+
+if __name__ == "__main__":
+    sys.exit(main())
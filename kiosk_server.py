@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import sys
+import time
+import urllib.request
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote, urlsplit
+
+import build_site
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+SITE_DIR = build_site.SITE_DIR
+VENDOR_DIR = os.path.join(SITE_DIR, "static", "vendor")
+
+HOST = "0.0.0.0"
+PORT = 8000
+
+CACHE_BYTES = 64 * 1024 * 1024     # Total size of the in-memory hot file cache
+MAX_CACHED_FILE = 512 * 1024       # Bigger files are streamed with sendfile instead
+KEEP_ALIVE_TIMEOUT = 15            # Seconds an idle connection is kept open
+MAX_HEADER_BYTES = 16 * 1024
+BACKLOG = 1024                     # A room of kiosks connects all at once
+CACHE_CONTROL = "public, max-age=3600"
+
+# Remote libraries the pages pull in, with the SRI hashes the pages already pin.
+CDN_FILES = [
+    ("https://code.jquery.com/jquery-3.3.1.slim.min.js",
+     "sha384-q8i/X+965DzO0rT7abK41JStQIAqVgRVzpbzo5smXKp4YfRvH+8abtTE1Pi6jizo"),
+    ("https://cdnjs.cloudflare.com/ajax/libs/popper.js/1.14.7/umd/popper.min.js",
+     "sha384-UO2eT0CpHqdSJQ6hJty5KVphtPhzWj9WO1clHTMGa3JDZwrnQq4sF86dIHNDz0W1"),
+    ("https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/js/bootstrap.min.js",
+     "sha384-JjSmVgyd0p3pXB1rRibZUAYoIIy6OrQ6VrjIEaFf/nJGzIxFDsf4x0xIM+B07jRM"),
+    ("https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css",
+     "sha384-ggOyR0iXCbMQv3Xipma34MD+dH/1fQ784/j6cY/iJTQUOhcWr7x9JvoRxT2MZw1T"),
+]
+
+# Text formats worth storing a .gz variant for (png, jpg, mp3 and woff are already compressed).
+COMPRESSIBLE = {".html", ".js", ".css", ".svg", ".json", ".txt", ".xml", ".ttf", ".eot", ".ico"}
+MIN_COMPRESS_SIZE = 256
+
+mimetypes.add_type("font/woff", ".woff")
+mimetypes.add_type("font/ttf", ".ttf")
+mimetypes.add_type("application/vnd.ms-fontobject", ".eot")
+mimetypes.add_type("image/svg+xml", ".svg")
+mimetypes.add_type("text/javascript", ".js")
+
+REASONS = {
+    200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+}
+
+# --------------------------
+# VENDORING & PRECOMPRESSION
+# --------------------------
+def vendor():
+    """
+    Downloads the CDN libraries into static/vendor (checking their SRI hashes)
+    and records the local copies in build_site.VENDOR_FILE, then rebuilds the
+    site with the pages pointing at them; the templates keep the CDN URLs.
+    Needs network access once; afterwards the kiosk box can stay offline.
+    """
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    replacements = {}
+    for url, integrity in CDN_FILES:
+        name = posixpath.basename(urlsplit(url).path)
+        dest = os.path.join(VENDOR_DIR, name)
+        if not os.path.exists(dest):
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+            algo, expected = integrity.split("-", 1)
+            actual = base64.b64encode(hashlib.new(algo, data).digest()).decode("ascii")
+            if actual != expected:
+                raise RuntimeError(f"integrity check failed for {url}")
+            with open(dest, "wb") as f:
+                f.write(data)
+            print(f"  vendored {url}")
+        replacements[url] = f"/static/vendor/{name}"
+
+    build_site.write_text(build_site.VENDOR_FILE, json.dumps(replacements, indent=1, sort_keys=True))
+    build_site.build()
+
+def compress(root=SITE_DIR, force=False):
+    """
+    Writes a gzip variant next to every compressible file (file.js -> file.js.gz)
+    whose variant is missing or older than the file. Variants that would not
+    be smaller than the original are skipped.
+    """
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in COMPRESSIBLE:
+                continue
+            path = os.path.join(dirpath, name)
+            gz_path = path + ".gz"
+            st = os.stat(path)
+            if st.st_size < MIN_COMPRESS_SIZE:
+                continue
+            if not force and os.path.exists(gz_path) and os.stat(gz_path).st_mtime_ns >= st.st_mtime_ns:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime=0 keeps the output (and so its ETag) stable across runs.
+            packed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(packed) >= len(data):
+                if os.path.exists(gz_path):
+                    os.remove(gz_path)
+                continue
+            with open(gz_path, "wb") as f:
+                f.write(packed)
+            written += 1
+    return written
+
+# --------------------------
+# FILE CACHE
+# --------------------------
+class FileCache:
+    """
+    Bounded LRU cache of small, hot file bodies. Entries are keyed by path and
+    remember the (mtime, size) they were read with, so edits are picked up.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, path, version):
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != version:
+            return None
+        self.entries.move_to_end(path)
+        return entry[1]
+
+    def put(self, path, version, data):
+        old = self.entries.pop(path, None)
+        if old is not None:
+            self.size -= len(old[1])
+        if len(data) > self.max_bytes:
+            return
+        self.entries[path] = (version, data)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+# --------------------------
+# HTTP SERVER
+# --------------------------
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+def parse_range(header, size):
+    """
+    Parses a single "bytes=" range. Returns (start, end) inclusive, None when the
+    header should be ignored (malformed or multiple ranges), and raises
+    HTTPError(416) when the range cannot be satisfied.
+    """
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise HTTPError(416)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise HTTPError(416)
+    return start, min(end, size - 1)
+
+class KioskServer:
+    def __init__(self, root=SITE_DIR, cache_bytes=CACHE_BYTES, max_cached_file=MAX_CACHED_FILE):
+        self.root = os.path.realpath(root)
+        self.cache = FileCache(cache_bytes)
+        self.max_cached_file = max_cached_file
+        self.etags = {}
+        self.requests = 0
+
+    # ----- Path and metadata helpers -----
+    def resolve(self, target):
+        path = urlsplit(target).path
+        candidates = [unquote(path)]
+        # The mirror stores some files with literal %20 in their names.
+        if path != candidates[0]:
+            candidates.append(path)
+        for candidate in candidates:
+            rel = posixpath.normpath(candidate).lstrip("/")
+            if rel.startswith(".."):
+                raise HTTPError(404)
+            full = os.path.join(self.root, rel)
+            if os.path.isdir(full):
+                full = os.path.join(full, "index.html")
+            if os.path.isfile(full):
+                return full
+        raise HTTPError(404)
+
+    def etag_for(self, path, st):
+        # Strong validator: a hash of the exact bytes, remembered per (mtime, size).
+        key = (path, st.st_mtime_ns, st.st_size)
+        etag = self.etags.get(key)
+        if etag is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            etag = '"' + h.hexdigest()[:32] + '"'
+            self.etags[key] = etag
+        return etag
+
+    def read_cached(self, path, st):
+        version = (st.st_mtime_ns, st.st_size)
+        data = self.cache.get(path, version)
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+            self.cache.put(path, version, data)
+        return data
+
+    # ----- Request handling -----
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, 400, "HTTP/1.1", close=True)
+                    break
+                keep_alive = await self.handle_request(head, reader, writer)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, head, reader, writer):
+        self.requests += 1
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            await self.send_error(writer, 400, "HTTP/1.1", close=True)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+
+        try:
+            length = headers.get("content-length", "0") or "0"
+            if not (length.isascii() and length.isdigit()):
+                # Without a usable length the body cannot be skipped, so the
+                # connection cannot carry another request either.
+                keep_alive = False
+                raise HTTPError(400)
+            if int(length):
+                await reader.readexactly(int(length))
+            if method not in ("GET", "HEAD"):
+                raise HTTPError(405)
+            path = self.resolve(target)
+            await self.send_file(writer, version, method, path, headers, keep_alive)
+        except HTTPError as e:
+            await self.send_error(writer, e.status, version, close=not keep_alive)
+        except asyncio.IncompleteReadError:
+            return False
+        except OSError:
+            await self.send_error(writer, 500, version, close=True)
+            return False
+        return keep_alive
+
+    async def send_file(self, writer, version, method, path, headers, keep_alive):
+        loop = asyncio.get_running_loop()
+        st = os.stat(path)
+        ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if ctype.startswith("text/") or ctype == "application/javascript":
+            ctype += "; charset=utf-8"
+
+        compressible = os.path.splitext(path)[1].lower() in COMPRESSIBLE
+        range_header = headers.get("range")
+        gz_path = path + ".gz"
+        encoding = None
+        if (compressible and range_header is None and "gzip" in headers.get("accept-encoding", "")
+                and os.path.exists(gz_path)):
+            gz_st = os.stat(gz_path)
+            if gz_st.st_mtime_ns >= st.st_mtime_ns:
+                path, st, encoding = gz_path, gz_st, "gzip"
+
+        if st.st_size > self.max_cached_file and (path, st.st_mtime_ns, st.st_size) not in self.etags:
+            etag = await loop.run_in_executor(None, self.etag_for, path, st)
+        else:
+            etag = self.etag_for(path, st)
+
+        out = {
+            "Content-Type": ctype,
+            "ETag": etag,
+            "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+            "Cache-Control": CACHE_CONTROL,
+            "Accept-Ranges": "bytes",
+        }
+        if compressible:
+            out["Vary"] = "Accept-Encoding"
+        if encoding:
+            out["Content-Encoding"] = encoding
+
+        if self.not_modified(headers, etag, st.st_mtime):
+            await self.send_head(writer, version, 304, out, keep_alive)
+            return
+
+        start, end = 0, st.st_size - 1
+        status = 200
+        if range_header is not None and self.range_applies(headers.get("if-range"), etag, st.st_mtime):
+            try:
+                byte_range = parse_range(range_header, st.st_size)
+            except HTTPError:
+                out = {"Content-Range": f"bytes */{st.st_size}", "Content-Length": "0"}
+                await self.send_head(writer, version, 416, out, keep_alive)
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+                out["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+
+        count = end - start + 1
+        out["Content-Length"] = str(count)
+        await self.send_head(writer, version, status, out, keep_alive)
+        if method == "HEAD" or count <= 0:
+            return
+
+        if st.st_size <= self.max_cached_file:
+            writer.write(self.read_cached(path, st)[start:end + 1])
+            await writer.drain()
+        else:
+            # Large media goes straight from the page cache to the socket.
+            with open(path, "rb") as f:
+                await loop.sendfile(writer.transport, f, start, count)
+
+    def not_modified(self, headers, etag, mtime):
+        inm = headers.get("if-none-match")
+        if inm is not None:
+            tags = [t.strip() for t in inm.split(",")]
+            return "*" in tags or etag in tags or ("W/" + etag) in tags
+        ims = headers.get("if-modified-since")
+        if ims:
+            try:
+                return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def range_applies(self, if_range, etag, mtime):
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            return if_range == etag
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    async def send_head(self, writer, version, status, headers, keep_alive):
+        lines = [f"{version if version == 'HTTP/1.0' else 'HTTP/1.1'} {status} {REASONS[status]}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 "Server: kiosk",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def send_error(self, writer, status, version, close=False):
+        body = f"{status} {REASONS[status]}\n".encode("ascii")
+        headers = {"Content-Type": "text/plain; charset=utf-8", "Content-Length": str(len(body))}
+        if status == 405:
+            headers["Allow"] = "GET, HEAD"
+        await self.send_head(writer, version, status, headers, not close)
+        writer.write(body)
+        await writer.drain()
+
+    async def start(self, host=HOST, port=PORT):
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES, backlog=BACKLOG)
+
+# --------------------------
+# MAIN
+# --------------------------
+async def serve(root, host, port):
+    server = KioskServer(root)
+    srv = await server.start(host, port)
+    print(f"Serving {root} on http://{host}:{port}/")
+    async with srv:
+        await srv.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline static server for the kiosk copy of supermario-game.com.")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "compress", "vendor"],
+                        help="serve the site (default), precompress it, or vendor the CDN libraries")
+    parser.add_argument("--root", default=SITE_DIR, help="directory to serve")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--force", action="store_true", help="recompress every file")
+    args = parser.parse_args()
+
+    if args.command == "vendor":
+        vendor()
+        args.command = "compress"
+    if args.command == "compress":
+        start = time.perf_counter()
+        written = compress(args.root, force=args.force)
+        print(f"{written} gzip variant(s) written in {time.perf_counter() - start:.2f} s")
+        return
+    try:
+        asyncio.run(serve(args.root, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
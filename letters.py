@@ -1,8 +1,14 @@
 import pygame
 from pygame.locals import *
+import os
 import random
 import string
 import math
+from array import array
+
+import entity_pool
+import results_client
+import word_index
 
 # Initialize Pygame and set up the window (with extra padding)
 pygame.init()
@@ -29,6 +35,17 @@ KEY_HEIGHT = 90
 KEY_SPACING = 30
 KEYBOARD_TOP = 250  # Increased top margin for keyboard
 
+# Word and sentence modes (see word_index.py for the word list format)
+WORD_LIST = os.environ.get("KIDS_WORD_LIST",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt"))
+WORDS_PER_ROUND = 10
+SENTENCES_PER_ROUND = 3
+MAX_WORD_LENGTH = 12
+MAX_SENTENCE_LENGTH = 40
+MAX_WORD_LEVEL = 5
+MIN_PRACTISED_LETTERS = 6  # With fewer practised letters, words may use any letter
+WORD_Y = 190               # Vertical center of the word being typed
+
 # Define Keyboard Rows (including number row, though game letters are A-Z)
 rows = [
     ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],  # First row: numbers
@@ -49,18 +66,42 @@ game_state = 'not_started'
 current_letter_index = 0
 start_time = 0
 final_time = 0
-wrong_presses = {}
+# Wrong-press highlight end times (ms), one slot per letter plus the space bar;
+# 0 means no highlight. Cleared in place each round.
+wrong_presses = array('q', bytes(8 * 27))
+NO_WRONG_PRESSES = array('q', bytes(8 * 27))
+game_mode = 'letters'      # 'letters', 'words' or 'sentences'
+current_word = ""
+typed_count = 0            # Characters of current_word typed so far
+words_done = 0
+word_level = 1
+practised_letters = set()  # Letters typed correctly this session
+word_dictionary = word_index.WordIndex(WORD_LIST)  # Nothing is loaded until a word is needed
 
 # Button Rectangles
 start_button = pygame.Rect((SCREEN_WIDTH - 200) // 2, 50, 200, 60)
 quit_button = pygame.Rect(SCREEN_WIDTH - 150, 10, 140, 60)
+words_button = pygame.Rect(SCREEN_WIDTH // 2 - 250, 130, 240, 60)
+sentences_button = pygame.Rect(SCREEN_WIDTH // 2 + 10, 130, 240, 60)
+space_bar = pygame.Rect((SCREEN_WIDTH - 600) // 2, KEYBOARD_TOP + 4 * (KEY_HEIGHT + KEY_SPACING), 600, KEY_HEIGHT)
 # play_again_button will be defined in draw_play_again_button
 
-# List to hold firework animations
-fireworks = []  # each entry: {"center": (x,y), "start_time": ms}
+# Firework animation records, recycled through a pool
+class Firework:
+    __slots__ = ("center", "start_time")
+
+    def __init__(self, center, start_time):
+        self.reset(center, start_time)
+
+    def reset(self, center, start_time):
+        self.center = center
+        self.start_time = start_time
+
+fireworks = []
+firework_pool = entity_pool.Pool(Firework)
 
-# List to hold each coin's initial random rotation offset (for spinning coins)
-coin_offsets = []
+# Each coin's initial random rotation offset (for spinning coins), refilled each round
+coin_offsets = array('d', bytes(8 * 26))
 
 # ----------------------
 # Drawing Functions
@@ -76,6 +117,8 @@ def draw_key(surface, x, y, character, bg_color, text_color):
 
 # Get the center position of a given key letter (if present in rows)
 def get_key_center(letter):
+    if letter == ' ':
+        return space_bar.center
     for row_idx, row in enumerate(rows):
         if letter in row:
             row_width = len(row) * KEY_WIDTH + (len(row) - 1) * KEY_SPACING
@@ -86,6 +129,33 @@ def get_key_center(letter):
                     y + KEY_HEIGHT / 2)
     return (0, 0)
 
+# Slot of a key ('A'-'Z' or ' ') in wrong_presses, or None for other keys
+def press_slot(char):
+    if char == ' ':
+        return 26
+    if 'A' <= char <= 'Z':
+        return ord(char) - 65
+    return None
+
+# Pick a key's colors from the highlight and wrong press effects
+def get_key_colors(char, highlighted_letter, wrong_presses, current_time):
+    if char == highlighted_letter:
+        return BRIGHT_YELLOW, BLACK
+    slot = press_slot(char)
+    # Digit and punctuation keys are never flagged as wrong presses.
+    if slot is None:
+        return DULL_GRAY, WHITE
+    end_time = wrong_presses[slot]
+    if end_time:
+        remaining = max(0, (end_time - current_time) / 1000.0)
+        if remaining > 0:
+            factor = remaining / 2.0
+            r = 100 + 50 * factor
+            g = 100 - 50 * factor
+            b = 100 - 50 * factor
+            return (int(r), int(g), int(b)), WHITE
+    return DULL_GRAY, WHITE
+
 # Draw the entire keyboard with highlight and wrong press effects
 def draw_keyboard(surface, highlighted_letter, wrong_presses, current_time):
     for row_idx, row in enumerate(rows):
@@ -94,27 +164,16 @@ def draw_keyboard(surface, highlighted_letter, wrong_presses, current_time):
         y = KEYBOARD_TOP + row_idx * (KEY_HEIGHT + KEY_SPACING)
         for i, char in enumerate(row):
             x = start_x + i * (KEY_WIDTH + KEY_SPACING)
-            if char == highlighted_letter:
-                bg_color = BRIGHT_YELLOW
-                text_color = BLACK
-            elif char in wrong_presses:
-                end_time = wrong_presses[char]
-                remaining = max(0, (end_time - current_time) / 1000.0)
-                if remaining > 0:
-                    factor = remaining / 2.0
-                    r = 100 + 50 * factor
-                    g = 100 - 50 * factor
-                    b = 100 - 50 * factor
-                    bg_color = (int(r), int(g), int(b))
-                    text_color = WHITE
-                else:
-                    bg_color = DULL_GRAY
-                    text_color = WHITE
-            else:
-                bg_color = DULL_GRAY
-                text_color = WHITE
+            bg_color, text_color = get_key_colors(char, highlighted_letter, wrong_presses, current_time)
             draw_key(surface, x, y, char, bg_color, text_color)
 
+# Draw the space bar below the keyboard (only needed for sentences)
+def draw_space_bar(surface, highlighted_letter, wrong_presses, current_time):
+    bg_color, text_color = get_key_colors(' ', highlighted_letter, wrong_presses, current_time)
+    pygame.draw.rect(surface, bg_color, space_bar, border_radius=8)
+    text = timer_font.render("SPACE", True, text_color)
+    surface.blit(text, text.get_rect(center=space_bar.center))
+
 # Draw the start button
 def draw_start_button(surface):
     pygame.draw.rect(surface, GREEN, start_button, border_radius=8)
@@ -122,6 +181,34 @@ def draw_start_button(surface):
     text_rect = text.get_rect(center=start_button.center)
     surface.blit(text, text_rect)
 
+# Draw the "Words" and "Sentences" buttons
+def draw_word_buttons(surface):
+    for button, label in ((words_button, "Words"), (sentences_button, "Sentences")):
+        pygame.draw.rect(surface, GREEN, button, border_radius=8)
+        text = key_font.render(label, True, BLACK)
+        text_rect = text.get_rect(center=button.center)
+        surface.blit(text, text_rect)
+
+# Draw the word being typed: typed part green, next character yellow and underlined
+def draw_word(surface, word, typed_count):
+    glyphs = []
+    for i, char in enumerate(word):
+        if i < typed_count:
+            color = GREEN
+        elif i == typed_count:
+            color = BRIGHT_YELLOW
+        else:
+            color = WHITE
+        glyphs.append(key_font.render(char, True, color))
+    x = (SCREEN_WIDTH - sum(glyph.get_width() for glyph in glyphs)) / 2
+    for i, glyph in enumerate(glyphs):
+        glyph_rect = glyph.get_rect(midleft=(x, WORD_Y))
+        surface.blit(glyph, glyph_rect)
+        if i == typed_count:
+            pygame.draw.line(surface, BRIGHT_YELLOW, (glyph_rect.left, glyph_rect.bottom + 4),
+                             (glyph_rect.right, glyph_rect.bottom + 4), 4)
+        x += glyph.get_width()
+
 # Draw the "Quit Game" button (always visible)
 def draw_quit_button(surface):
     pygame.draw.rect(surface, GRAYISH_RED, quit_button, border_radius=8)
@@ -202,7 +289,7 @@ def draw_fireworks(surface, current_time):
     max_offset = 120
     finished = []
     for fw in fireworks:
-        elapsed = current_time - fw["start_time"]
+        elapsed = current_time - fw.start_time
         if elapsed > duration:
             finished.append(fw)
             continue
@@ -212,7 +299,7 @@ def draw_fireworks(surface, current_time):
         color = (int(BRIGHT_YELLOW[0] * fade),
                  int(BRIGHT_YELLOW[1] * fade),
                  int(BRIGHT_YELLOW[2] * fade))
-        center_x, center_y = fw["center"]
+        center_x, center_y = fw.center
         for angle_deg in range(0, 360, 45):
             angle_rad = math.radians(angle_deg)
             burst_x = center_x + offset * math.cos(angle_rad)
@@ -222,6 +309,25 @@ def draw_fireworks(surface, current_time):
         pygame.draw.circle(surface, color, (int(center_x), int(center_y)), int(5 * (1 - progress)))
     for fw in finished:
         fireworks.remove(fw)
+        firework_pool.release(fw)
+
+# ----------------------
+# Word Selection
+# ----------------------
+
+# Pick the next word (or sentence) for the current mode and level.
+# Once enough letters have been practised, only words made of them are used.
+def next_word():
+    sentences = game_mode == 'sentences'
+    max_length = MAX_SENTENCE_LENGTH if sentences else MAX_WORD_LENGTH
+    if len(practised_letters) >= MIN_PRACTISED_LETTERS:
+        pool = word_dictionary.pool(2, max_length, word_level, practised_letters, sentences)
+        if len(pool) > 0:
+            return pool.pick()
+    pool = word_dictionary.pool(2, max_length, word_level, None, sentences)
+    if len(pool) == 0:
+        pool = word_dictionary.pool(sentences=sentences)
+    return pool.pick() if len(pool) > 0 else None
 
 # ----------------------
 # Main Game Loop
@@ -235,47 +341,102 @@ while running:
         elif event.type == MOUSEBUTTONDOWN:
             if quit_button.collidepoint(event.pos):
                 running = False
+            if game_state == 'not_started' and word_dictionary.available():
+                for mode, button in (('words', words_button), ('sentences', sentences_button)):
+                    if button.collidepoint(event.pos):
+                        game_mode = mode
+                        current_word = next_word()
+                        if current_word is None:
+                            game_mode = 'letters'
+                            break
+                        typed_count = 0
+                        words_done = 0
+                        start_time = pygame.time.get_ticks()
+                        game_state = 'in_progress'
+                        wrong_presses[:] = NO_WRONG_PRESSES
+                        for i in range(WORDS_PER_ROUND):
+                            coin_offsets[i] = random.uniform(0, 2 * math.pi)
             if game_state == 'not_started' and start_button.collidepoint(event.pos):
+                game_mode = 'letters'
                 random.shuffle(letters)
                 current_letter_index = 0
                 start_time = pygame.time.get_ticks()
                 game_state = 'in_progress'
-                wrong_presses = {}
-                coin_offsets = [random.uniform(0, 2 * math.pi) for _ in range(26)]
+                wrong_presses[:] = NO_WRONG_PRESSES
+                for i in range(26):
+                    coin_offsets[i] = random.uniform(0, 2 * math.pi)
             if game_state == 'finished':
                 play_again_button = pygame.Rect((SCREEN_WIDTH - 300) // 2, SCREEN_HEIGHT - 220, 300, 80)
                 if play_again_button.collidepoint(event.pos):
+                    if game_mode != 'letters':
+                        word_level = min(word_level + 1, MAX_WORD_LEVEL)
                     game_state = 'not_started'
                     current_letter_index = 0
-                    wrong_presses = {}
+                    words_done = 0
+                    wrong_presses[:] = NO_WRONG_PRESSES
         elif event.type == KEYDOWN and game_state == 'in_progress':
-            if event.key == letter_to_key[letters[current_letter_index]]:
-                key_center = get_key_center(letters[current_letter_index])
-                fireworks.append({"center": key_center, "start_time": current_time})
-                current_letter_index += 1
-                if current_letter_index == 26:
-                    game_state = 'finished'
-                    final_time = (pygame.time.get_ticks() - start_time) / 1000.0
-            elif event.key in key_to_letter:
-                char = key_to_letter[event.key]
-                wrong_presses[char] = pygame.time.get_ticks() + 2000
+            if game_mode == 'letters':
+                if event.key == letter_to_key[letters[current_letter_index]]:
+                    practised_letters.add(letters[current_letter_index])
+                    key_center = get_key_center(letters[current_letter_index])
+                    fireworks.append(firework_pool.acquire(key_center, current_time))
+                    current_letter_index += 1
+                    if current_letter_index == 26:
+                        game_state = 'finished'
+                        final_time = (pygame.time.get_ticks() - start_time) / 1000.0
+                        results_client.submit_result("letters", final_time)
+                elif event.key in key_to_letter:
+                    char = key_to_letter[event.key]
+                    wrong_presses[press_slot(char)] = pygame.time.get_ticks() + 2000
+            else:
+                # Match each keystroke against the next character of the current word only.
+                expected = current_word[typed_count]
+                if event.key == (K_SPACE if expected == ' ' else letter_to_key[expected]):
+                    if expected != ' ':
+                        practised_letters.add(expected)
+                    typed_count += 1
+                    if typed_count == len(current_word):
+                        fireworks.append(firework_pool.acquire((SCREEN_WIDTH // 2, WORD_Y), current_time))
+                        words_done += 1
+                        round_length = SENTENCES_PER_ROUND if game_mode == 'sentences' else WORDS_PER_ROUND
+                        if words_done == round_length:
+                            game_state = 'finished'
+                            final_time = (pygame.time.get_ticks() - start_time) / 1000.0
+                            results_client.submit_result("letters_" + game_mode, final_time)
+                        else:
+                            current_word = next_word()
+                            typed_count = 0
+                elif event.key in key_to_letter:
+                    char = key_to_letter[event.key]
+                    wrong_presses[press_slot(char)] = pygame.time.get_ticks() + 2000
+                elif event.key == K_SPACE:
+                    wrong_presses[press_slot(' ')] = pygame.time.get_ticks() + 2000
 
     screen.fill(BLACK)
     draw_quit_button(screen)
     
     if game_state == 'not_started':
         draw_start_button(screen)
+        if word_dictionary.available():
+            draw_word_buttons(screen)
         draw_keyboard(screen, None, wrong_presses, current_time)
         draw_coins(screen, current_letter_index, current_time)
     elif game_state == 'in_progress':
         elapsed_time = (current_time - start_time) / 1000.0
         draw_timer(screen, elapsed_time)
-        draw_keyboard(screen, letters[current_letter_index], wrong_presses, current_time)
-        draw_coins(screen, current_letter_index, current_time)
+        if game_mode == 'letters':
+            draw_keyboard(screen, letters[current_letter_index], wrong_presses, current_time)
+            draw_coins(screen, current_letter_index, current_time)
+        else:
+            next_char = current_word[typed_count]
+            draw_word(screen, current_word, typed_count)
+            draw_keyboard(screen, next_char, wrong_presses, current_time)
+            draw_space_bar(screen, next_char, wrong_presses, current_time)
+            draw_coins(screen, words_done, current_time)
     elif game_state == 'finished':
         draw_keyboard(screen, None, wrong_presses, current_time)
         draw_final_message(screen, final_time)
-        draw_coins(screen, current_letter_index, current_time)
+        draw_coins(screen, current_letter_index if game_mode == 'letters' else words_done, current_time)
         play_again_button = draw_play_again_button(screen)
 
     draw_fireworks(screen, current_time)
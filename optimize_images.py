@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+import build_site
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+SITE_DIR = build_site.SITE_DIR
+MANIFEST_FILE = build_site.IMAGE_MANIFEST
+OUTPUT_DIR = "static/optimized"      # Relative to the site directory
+
+# Directories (relative to the site directory) whose images get variants.
+SOURCE_DIRS = [
+    "media-files/desktop",
+    "media-files/mobile",
+    "static/images",
+    "mario-game/assets/img",
+]
+EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+# Widths to generate; each image also keeps a variant at its own width.
+BREAKPOINTS = [32, 64, 128, 320, 640, 1024, 1280, 1920]
+JPEG_QUALITY = 82
+
+# Changing this string invalidates every cached variant.
+SETTINGS = f"v1 breakpoints={BREAKPOINTS} jpeg_quality={JPEG_QUALITY}"
+
+# --------------------------
+# HELPER FUNCTIONS
+# --------------------------
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("settings") == SETTINGS else {}
+
+def encode(image, fmt):
+    """
+    Returns the recompressed bytes of an image. Metadata such as EXIF is dropped.
+    """
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+def process_image(site_dir, rel, source_hash):
+    """
+    Worker entry point: writes every breakpoint variant of one image under
+    OUTPUT_DIR with a content hash in its name, and returns its manifest entry.
+    """
+    path = os.path.join(site_dir, rel)
+    stem, ext = os.path.splitext(os.path.basename(rel))
+    with Image.open(path) as image:
+        image.load()
+        fmt = "JPEG" if image.format == "JPEG" else "PNG"
+        width, height = image.size
+        widths = [w for w in BREAKPOINTS if w < width] + [width]
+        source_size = os.path.getsize(path)
+
+        variants = []
+        for w in widths:
+            if w == width:
+                resized = image
+            else:
+                resized = image.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+            data = encode(resized, fmt)
+            if w == width and len(data) >= source_size:
+                # Recompressing did not help; the original is already the best full-size file.
+                variants.append({"width": w, "path": rel})
+                continue
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            out_rel = f"{OUTPUT_DIR}/{stem}-{w}w.{digest}{ext.lower()}"
+            out_path = os.path.join(site_dir, out_rel)
+            if not os.path.exists(out_path):
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with open(out_path, "wb") as f:
+                    f.write(data)
+            variants.append({"width": w, "path": out_rel})
+    return rel, {"sha256": source_hash, "width": width, "height": height, "variants": variants}
+
+def find_sources(site_dir):
+    sources = []
+    for source_dir in SOURCE_DIRS:
+        full = os.path.join(site_dir, source_dir)
+        if not os.path.isdir(full):
+            continue
+        for name in sorted(os.listdir(full)):
+            if os.path.splitext(name)[1].lower() in EXTENSIONS:
+                sources.append(f"{source_dir}/{name}")
+    return sources
+
+def cached(entry, source_hash, site_dir):
+    return (entry is not None and entry["sha256"] == source_hash
+            and all(os.path.exists(os.path.join(site_dir, v["path"])) for v in entry["variants"]))
+
+def prune(site_dir, images):
+    """
+    Deletes generated files that no manifest entry refers to any more.
+    """
+    out_dir = os.path.join(site_dir, OUTPUT_DIR)
+    if not os.path.isdir(out_dir):
+        return 0
+    keep = {v["path"] for entry in images.values() for v in entry["variants"]}
+    removed = 0
+    for name in os.listdir(out_dir):
+        if f"{OUTPUT_DIR}/{name}" not in keep:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+# --------------------------
+# PIPELINE
+# --------------------------
+def optimize(site_dir=SITE_DIR, workers=None, force=False):
+    """
+    Generates variants for every changed image, writes the manifest that
+    build_site uses to add srcset attributes, and returns
+    (processed, reused) image counts.
+    """
+    if Image is None:
+        raise RuntimeError("optimize_images.py needs Pillow (pip install pillow)")
+
+    manifest = {} if force else load_manifest()
+    previous = manifest.get("images", {})
+    images = {}
+    todo = []
+    for rel in find_sources(site_dir):
+        source_hash = build_site.file_digest(os.path.join(site_dir, rel))
+        if cached(previous.get(rel), source_hash, site_dir):
+            images[rel] = previous[rel]
+        else:
+            todo.append((rel, source_hash))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_image, site_dir, rel, source_hash) for rel, source_hash in todo]
+            for future in futures:
+                rel, entry = future.result()
+                images[rel] = entry
+
+    images = dict(sorted(images.items()))
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump({"settings": SETTINGS, "images": images}, f, indent=1)
+    prune(site_dir, images)
+    return len(todo), len(images) - len(todo)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate responsive image variants and rebuild the pages.")
+    parser.add_argument("--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and reprocess every image")
+    parser.add_argument("--no-build", action="store_true", help="only generate variants")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    processed, reused = optimize(workers=args.jobs, force=args.force)
+    print(f"{processed} image(s) processed, {reused} unchanged, in {time.perf_counter() - start:.2f} s")
+    if not args.no_build:
+        written = build_site.build()
+        print(f"{len(written)} page(s) rewritten")
+
+if __name__ == "__main__":
+    sys.exit(main())
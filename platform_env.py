@@ -0,0 +1,319 @@
+import importlib.util
+import math
+import multiprocessing
+import os
+import sys
+from array import array
+
+# The environments never open a window or play sound.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+def _load_platformer():
+    # 2d_platform.py is not an importable module name, so load it by path.
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2d_platform.py")
+    spec = importlib.util.spec_from_file_location("platformer", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["platformer"] = module
+    spec.loader.exec_module(module)
+    return module
+
+platformer = sys.modules.get("platformer") or _load_platformer()
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+# Actions are (horizontal speed, jump) pairs; an agent picks one by index.
+_speed = platformer.PLAYER_SPEED
+ACTIONS = [(0, False), (-_speed, False), (_speed, False), (0, True), (-_speed, True), (_speed, True)]
+ACTION_NAMES = ["noop", "left", "right", "jump", "left+jump", "right+jump"]
+
+FRAME_SKIP = 4            # Game frames per env step, swept in one physics step
+MAX_STEPS = 2000          # Steps before an episode is truncated
+MAX_ENEMIES = 8           # Entity slots in the observation; extras are left out
+MAX_COINS = 8
+
+# Rewards
+SCORE_REWARD = 0.1        # Per point of in-game score (coins and stomps)
+COIN_REWARD = 0.5         # Extra per coin collected
+LEVEL_REWARD = 10.0       # Per level completed
+LIFE_PENALTY = 5.0        # Per life lost
+
+# Observation vector, all float32 and positions scaled to 0..1 of the screen:
+#   player: x, y, vel_y, lives, level
+#   MAX_ENEMIES x (alive, x, y), MAX_COINS x (present, x, y), star (present, x, y)
+PLAYER_FIELDS = 5
+OBS_SIZE = PLAYER_FIELDS + 3 * (MAX_ENEMIES + MAX_COINS + 1)
+
+# Optional downsampled frame: one byte per pixel holding what is there.
+FRAME_SIZE = (80, 60)
+EMPTY, PLATFORM, COIN, STAR, ENEMY, PLAYER = range(6)
+
+# --------------------------
+# SINGLE ENVIRONMENT
+# --------------------------
+class PlatformEnv:
+    """
+    Gym-style wrapper around one platformer run. reset() returns
+    (observation, info) and step(action) returns (observation, reward,
+    terminated, truncated, info). The observation is an array('f') of
+    OBS_SIZE values, or {"state": ..., "frame": ...} when frames is set.
+    """
+    action_count = len(ACTIONS)
+    observation_size = OBS_SIZE
+
+    def __init__(self, level=1, frame_skip=FRAME_SKIP, max_steps=MAX_STEPS, frames=False, frame_size=FRAME_SIZE):
+        self.start_level = level
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.frames = frames
+        self.frame_size = frame_size
+        self.frame_surface = pygame.Surface(frame_size, depth=8) if frames else None
+        self.game = None
+
+    def reset(self, seed=None, options=None):
+        # The levels are fixed, so seed is accepted only for API compatibility.
+        level = (options or {}).get("level", self.start_level)
+        if self.game is None:
+            self.game = platformer.Game(level)
+        else:
+            self.game.reset(level)
+        self.steps = 0
+        self.track_level()
+        return self.observe(), self.info()
+
+    def track_level(self):
+        # Fixed observation slots for this level's entities, so an enemy
+        # keeps its slot after others are stomped.
+        game = self.game
+        self.level_enemies = list(game.enemies)[:MAX_ENEMIES]
+        self.level_coins = list(game.coins)[:MAX_COINS]
+        self.level_stars = list(game.stars)[:1]
+        self.tracked_level = game.level
+
+    def step(self, action):
+        game = self.game
+        player = game.player
+        dx, jump = ACTIONS[action]
+        before = (player.score, player.coins, player.lives, game.level)
+
+        if jump:
+            player.jump()
+        game.step(dx, self.frame_skip)
+        self.steps += 1
+        if game.level != self.tracked_level and not game.over:
+            self.track_level()
+
+        score, coins, lives, level = before
+        reward = (SCORE_REWARD * (player.score - score) + COIN_REWARD * (player.coins - coins)
+                  + LEVEL_REWARD * (game.level - level) - LIFE_PENALTY * (lives - player.lives))
+        terminated = game.over
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def info(self):
+        game = self.game
+        return {"score": game.player.score, "coins": game.player.coins, "lives": game.player.lives,
+                "level": game.level, "won": game.won()}
+
+    # ----- Observations -----
+    def state(self):
+        game = self.game
+        player = game.player
+        obs = array("f", [player.rect.centerx / platformer.SCREEN_WIDTH,
+                          player.rect.centery / platformer.SCREEN_HEIGHT,
+                          player.vel_y / -platformer.JUMP_VELOCITY,
+                          player.lives / 3,
+                          game.level / platformer.LAST_LEVEL])
+        for sprites, slots in ((self.level_enemies, MAX_ENEMIES), (self.level_coins, MAX_COINS),
+                               (self.level_stars, 1)):
+            for sprite in sprites:
+                if sprite.alive():
+                    obs.extend((1.0, sprite.rect.centerx / platformer.SCREEN_WIDTH,
+                                sprite.rect.centery / platformer.SCREEN_HEIGHT))
+                else:
+                    obs.extend((0.0, 0.0, 0.0))
+            obs.extend([0.0] * (3 * (slots - len(sprites))))
+        return obs
+
+    def frame(self):
+        """
+        Returns the screen drawn straight at frame_size as bytes, one per
+        pixel, each holding EMPTY, PLATFORM, COIN, STAR, ENEMY or PLAYER.
+        """
+        game = self.game
+        surface = self.frame_surface
+        width, height = self.frame_size
+        sx = width / platformer.SCREEN_WIDTH
+        sy = height / platformer.SCREEN_HEIGHT
+        surface.fill(EMPTY)
+        for code, sprites in ((PLATFORM, game.platforms), (COIN, game.coins), (STAR, game.stars),
+                              (ENEMY, game.enemies), (PLAYER, (game.player,))):
+            for sprite in sprites:
+                x, y, w, h = sprite.rect
+                surface.fill(code, (int(x * sx), int(y * sy),
+                                    max(1, math.ceil(w * sx)), max(1, math.ceil(h * sy))))
+        return pygame.image.tobytes(surface, "P")
+
+    def observe(self):
+        if self.frames:
+            return {"state": self.state(), "frame": self.frame()}
+        return self.state()
+
+# --------------------------
+# VECTORIZED ENVIRONMENTS
+# --------------------------
+class SharedBuffers:
+    """
+    One block of shared memory holding every environment's observation,
+    reward, done flags, action and frame. Workers write their rows in
+    place; the views here are memoryviews that numpy.asarray() can wrap
+    without copying.
+    """
+    def __init__(self, num_envs, frame_size=None, raw=None):
+        frame_bytes = frame_size[0] * frame_size[1] if frame_size else 0
+        self.layout = {}
+        size = 0
+        for name, fmt, shape in (("observations", "f", (num_envs, OBS_SIZE)),
+                                 ("rewards", "f", (num_envs,)),
+                                 ("terminated", "B", (num_envs,)),
+                                 ("truncated", "B", (num_envs,)),
+                                 ("actions", "B", (num_envs,)),
+                                 ("frames", "B", (num_envs, frame_bytes))):
+            nbytes = math.prod(shape) * (4 if fmt == "f" else 1)
+            self.layout[name] = (size, nbytes, fmt, shape)
+            size += -nbytes % 4 + nbytes  # keep the next float block aligned
+        self.raw = raw if raw is not None else multiprocessing.RawArray("B", max(size, 1))
+        self.frame_size = frame_size
+        whole = memoryview(self.raw).cast("B")
+        for name, (start, nbytes, fmt, shape) in self.layout.items():
+            view = whole[start:start + nbytes].cast(fmt)
+            setattr(self, name, view)
+            # Two-dimensional views for the caller; workers use the flat ones.
+            setattr(self, name + "_view", view.cast("B").cast(fmt, shape) if nbytes else view)
+
+def _worker(conn, raw, num_envs, first, last, frame_size, env_kwargs):
+    buffers = SharedBuffers(num_envs, frame_size, raw)
+    envs = [PlatformEnv(frames=frame_size is not None, frame_size=frame_size or FRAME_SIZE, **env_kwargs)
+            for _ in range(first, last)]
+    frame_bytes = frame_size[0] * frame_size[1] if frame_size else 0
+
+    def write(i, obs, reward=0.0, terminated=False, truncated=False):
+        if frame_bytes:
+            buffers.frames[i * frame_bytes:(i + 1) * frame_bytes] = obs["frame"]
+            obs = obs["state"]
+        buffers.observations[i * OBS_SIZE:(i + 1) * OBS_SIZE] = memoryview(obs)
+        buffers.rewards[i] = reward
+        buffers.terminated[i] = terminated
+        buffers.truncated[i] = truncated
+
+    try:
+        while True:
+            command, arg = conn.recv()
+            reply = None
+            if command == "step":
+                reply = {}
+                for i, env in enumerate(envs, first):
+                    obs, reward, terminated, truncated, info = env.step(buffers.actions[i])
+                    if terminated or truncated:
+                        # Auto-reset: the row holds the first observation of the
+                        # next episode, the finished one goes back in the reply.
+                        reply[i] = (obs, info)
+                        obs, _ = env.reset()
+                    write(i, obs, reward, terminated, truncated)
+            elif command == "reset":
+                for i, env in enumerate(envs, first):
+                    write(i, env.reset(options=arg)[0])
+            elif command == "close":
+                break
+            conn.send(reply)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+class VecPlatformEnv:
+    """
+    num_envs environments split across num_workers processes. Every call
+    sends each worker a short command over a pipe and waits for its
+    acknowledgement; observations, rewards and frames never travel through
+    the pipes, they are read from SharedBuffers. Finished episodes reset
+    automatically, as in gym's vector environments; only their last
+    observation and info come back through the pipes.
+    """
+    def __init__(self, num_envs, num_workers=None, frames=False, frame_size=FRAME_SIZE, **env_kwargs):
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.buffers = SharedBuffers(num_envs, frame_size if frames else None)
+        self.conns = []
+        self.processes = []
+        for w in range(num_workers):
+            first = w * num_envs // num_workers
+            last = (w + 1) * num_envs // num_workers
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, name=f"platform-env-{w}", daemon=True,
+                args=(child, self.buffers.raw, num_envs, first, last, self.buffers.frame_size, env_kwargs))
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def _call(self, command, arg=None):
+        for conn in self.conns:
+            conn.send((command, arg))
+        return [conn.recv() for conn in self.conns]
+
+    def reset(self, options=None):
+        """
+        Resets every environment and returns the (num_envs, OBS_SIZE) observations.
+        """
+        self._call("reset", options)
+        return self.buffers.observations_view
+
+    def step(self, actions):
+        """
+        Applies one action index per environment and returns (observations,
+        rewards, terminated, truncated, infos). The first four are shared
+        views, valid until the next call; frames, when enabled, are in
+        buffers.frames_view. When an episode ends, its row already holds the
+        next episode's first observation, and infos["final_observation"][i]
+        and infos["final_info"][i] hold the finished one's last; infos is
+        empty when no episode ended.
+        """
+        # int() each action so numpy integers of any width work too.
+        self.buffers.actions[:] = bytes(int(action) for action in actions)
+        infos = {}
+        for reply in self._call("step"):
+            for i, (obs, info) in reply.items():
+                if not infos:
+                    infos = {"final_observation": [None] * self.num_envs, "final_info": [None] * self.num_envs}
+                infos["final_observation"][i] = obs
+                infos["final_info"][i] = info
+        b = self.buffers
+        return b.observations_view, b.rewards_view, b.terminated_view, b.truncated_view, infos
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.conns:
+            conn.close()
+        self.conns = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
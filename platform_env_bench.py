@@ -0,0 +1,73 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import platform_env
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+ENVS = 32
+STEPS = 200               # Vector steps per measurement, after WARMUP_STEPS
+WARMUP_STEPS = 10
+
+# --------------------------
+# MEASUREMENTS
+# --------------------------
+def bench_single(steps, frames):
+    """
+    The baseline: one environment stepped in this process.
+    """
+    env = platform_env.PlatformEnv(frames=frames)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(random.randrange(env.action_count))
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+def bench_vector(num_envs, num_workers, steps, frames):
+    with platform_env.VecPlatformEnv(num_envs, num_workers, frames=frames) as env:
+        env.reset()
+        actions = [0] * num_envs
+        for _ in range(WARMUP_STEPS):
+            env.step(actions)
+        start = time.perf_counter()
+        for _ in range(steps):
+            env.step([random.randrange(platform_env.PlatformEnv.action_count) for _ in range(num_envs)])
+        elapsed = time.perf_counter() - start
+    return num_envs * steps / elapsed
+
+def worker_counts(limit):
+    counts = []
+    n = 1
+    while n < limit:
+        counts.append(n)
+        n *= 2
+    return counts + [limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure platform_env.py throughput against worker count.")
+    parser.add_argument("--envs", type=int, default=ENVS, help="environments in the vector")
+    parser.add_argument("--steps", type=int, default=STEPS, help="vector steps per measurement")
+    parser.add_argument("--workers", type=int, nargs="*",
+                        help="worker counts to try (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--frames", action="store_true", help="also render the downsampled frames")
+    args = parser.parse_args()
+
+    counts = args.workers or worker_counts(min(args.envs, os.cpu_count() or 1))
+    frames = " with frames" if args.frames else ""
+    print(f"{os.cpu_count()} CPUs, frame_skip {platform_env.FRAME_SKIP}{frames}")
+    print(f"{'in-process':>10}: {bench_single(args.steps * 4, args.frames):>9.0f} steps/s (1 env)")
+    baseline = None
+    for workers in counts:
+        rate = bench_vector(args.envs, workers, args.steps, args.frames)
+        baseline = baseline or rate
+        print(f"{workers:>3} worker{'s' if workers > 1 else ' '}: {rate:>9.0f} steps/s "
+              f"({args.envs} envs, {rate / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from platform_env import platformer
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+TRANSITIONS = 5000
+
+# --------------------------
+# LEVEL TRANSITIONS
+# --------------------------
+def fresh_transitions(count):
+    """
+    A level change as main() used to do it: new groups and new sprites.
+    """
+    player = platformer.Player(50)
+    for i in range(count):
+        platforms, enemies, coins, stars, nav = platformer.create_level(i % platformer.LAST_LEVEL + 1)
+        all_sprites = platformer.pygame.sprite.Group()
+        all_sprites.add(platforms, enemies, coins, stars, player)
+        player.respawn()
+
+def pooled_transitions(count):
+    """
+    A level change through Game, which recycles its groups and sprites.
+    """
+    game = platformer.Game()
+    for i in range(count):
+        game.level = i % platformer.LAST_LEVEL + 1
+        game.load_level()
+        game.player.respawn()
+    return game.pool
+
+# --------------------------
+# MEASUREMENT
+# --------------------------
+def measure(run, count):
+    pauses = []
+    started = []
+
+    def on_gc(phase, info):
+        if phase == "start":
+            started.append(time.perf_counter())
+        elif started:
+            pauses.append(time.perf_counter() - started.pop())
+
+    # Warm the navigation graph cache and image cache first, so both runs
+    # measure only the transitions themselves.
+    run(platformer.LAST_LEVEL)
+    gc.collect()
+    before = [stats["collections"] for stats in gc.get_stats()]
+    gc.callbacks.append(on_gc)
+    start = time.perf_counter()
+    result = run(count)
+    elapsed = time.perf_counter() - start
+    gc.callbacks.remove(on_gc)
+    collections = [stats["collections"] - n for stats, n in zip(gc.get_stats(), before)]
+
+    gc.collect()
+    tracemalloc.start()
+    run(count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, collections, pauses, peak, result
+
+def report(name, count, elapsed, collections, pauses, peak):
+    print(f"{name:>6}: {elapsed / count * 1e6:7.1f} us/transition  "
+          f"gc collections (gen0/1/2) {'/'.join(str(n) for n in collections)}  "
+          f"gc pause total {sum(pauses) * 1000:.2f} ms (max {max(pauses, default=0) * 1000:.3f} ms)  "
+          f"peak traced {peak / 1024:.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report GC activity and peak memory across platformer level changes.")
+    parser.add_argument("--transitions", type=int, default=TRANSITIONS)
+    args = parser.parse_args()
+
+    print(f"{args.transitions} level transitions")
+    elapsed, collections, pauses, peak, _ = measure(fresh_transitions, args.transitions)
+    report("fresh", args.transitions, elapsed, collections, pauses, peak)
+    elapsed, collections, pauses, peak, pool = measure(pooled_transitions, args.transitions)
+    report("pooled", args.transitions, elapsed, collections, pauses, peak)
+    created = ", ".join(f"{cls.__name__} {p.created}" for cls, p in pool.pools.items())
+    print(f"sprites ever built by the pool: {created}")
+
+if __name__ == "__main__":
+    sys.exit(main())
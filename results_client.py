@@ -0,0 +1,122 @@
+import atexit
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+# Point the games at the classroom results_server.py with these variables.
+HOST = os.environ.get("KIDS_RESULTS_HOST", "127.0.0.1")
+PORT = int(os.environ.get("KIDS_RESULTS_PORT", "8766"))
+PLAYER = os.environ.get("KIDS_PLAYER") or socket.gethostname()
+SPOOL_PATH = os.environ.get("KIDS_RESULTS_SPOOL", os.path.expanduser("~/.linux_kids_results.jsonl"))
+
+CONNECT_TIMEOUT = 0.5     # Seconds; the game never waits on this
+EXIT_TIMEOUT = 1.0        # Seconds to keep trying to deliver results when the game quits
+
+_queue = queue.Queue()
+_done = threading.Condition()
+_unsent = 0               # Results queued but not yet delivered or spooled
+_thread = None
+
+# --------------------------
+# SPOOL
+# --------------------------
+def _read_spool():
+    results = []
+    try:
+        with open(SPOOL_PATH, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    pass  # A line cut short by a crash; keep the rest
+    except OSError:
+        pass
+    return results
+
+def _append_spool(results):
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    try:
+        with open(SPOOL_PATH, "ab+") as f:
+            # Start on a fresh line if the last write was cut short.
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+    except OSError:
+        pass
+
+def _clear_spool():
+    try:
+        os.remove(SPOOL_PATH)
+    except OSError:
+        pass
+
+# --------------------------
+# SENDER THREAD
+# --------------------------
+def _send(results):
+    with socket.create_connection((HOST, PORT), timeout=CONNECT_TIMEOUT) as sock:
+        sock.sendall(json.dumps({"op": "submit", "results": results}).encode("utf-8") + b"\n")
+        reply = sock.makefile("rb").readline()
+    if not json.loads(reply).get("ok"):
+        raise ValueError("results server rejected the batch")
+
+def _worker():
+    while True:
+        results = [_queue.get()]
+        while not _queue.empty():
+            results.append(_queue.get_nowait())
+        # Anything that could not be delivered earlier goes out first.
+        spooled = _read_spool()
+        try:
+            _send(spooled + results)
+            if spooled:
+                _clear_spool()
+        except (OSError, ValueError):
+            _append_spool(results)
+        _finished(len(results))
+
+def _finished(count):
+    global _unsent
+    with _done:
+        _unsent -= count
+        _done.notify_all()
+
+def _start():
+    global _thread
+    with _done:
+        if _thread is None:
+            _thread = threading.Thread(target=_worker, name="results-client", daemon=True)
+            _thread.start()
+            atexit.register(flush)
+
+# --------------------------
+# PUBLIC API
+# --------------------------
+def submit_result(game, value):
+    """
+    Queues one finished run for the classroom leaderboard and returns at once.
+    Delivery happens on a background thread; if the service cannot be reached
+    the result is kept in a local spool file and sent with the next result.
+    """
+    global _unsent
+    with _done:
+        _unsent += 1
+    _queue.put({"game": game, "player": PLAYER, "value": value, "ts": time.time()})
+    _start()
+
+def flush(timeout=EXIT_TIMEOUT):
+    """
+    Waits (briefly) for queued results to be delivered or spooled.
+    """
+    with _done:
+        return _done.wait_for(lambda: _unsent == 0, timeout)
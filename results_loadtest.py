@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import results_server
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+CLIENTS = 300
+RESULTS_PER_CLIENT = 50
+QUERY_EVERY = 5           # Each client checks the leaderboard after this many submits
+
+# --------------------------
+# SIMULATED CLIENTS
+# --------------------------
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def client(n, port, count, submit_times, query_times):
+    """
+    One station: opens a connection per result, like results_client does,
+    and keeps a connection open to poll the leaderboard.
+    """
+    player = f"station-{n:03d}"
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(count):
+        game = random.choice(sorted(results_server.GAMES))
+        value = random.uniform(10, 120) if results_server.GAMES[game] == "time" else random.randint(0, 200)
+        start = time.perf_counter()
+        sub_reader, sub_writer = await asyncio.open_connection("127.0.0.1", port)
+        reply = await request(sub_reader, sub_writer, {"op": "submit", "results": [
+            {"game": game, "player": player, "value": value}]})
+        sub_writer.close()
+        submit_times.append(time.perf_counter() - start)
+        assert reply["ok"] and reply["accepted"] == 1
+        if i % QUERY_EVERY == 0:
+            start = time.perf_counter()
+            reply = await request(reader, writer, {"op": "top", "game": game})
+            query_times.append(time.perf_counter() - start)
+            assert reply["ok"]
+    writer.close()
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def report(name, values):
+    print(f"{name:>7}: n={len(values)}  p50={percentile(values, 50) * 1000:.2f} ms  "
+          f"p95={percentile(values, 95) * 1000:.2f} ms  p99={percentile(values, 99) * 1000:.2f} ms  "
+          f"max={max(values) * 1000:.2f} ms")
+
+async def run(clients, per_client):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "results.sqlite3")
+        server = results_server.ResultsServer(db_path)
+        srv = await server.start("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+
+        submit_times = []
+        query_times = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(n, port, per_client, submit_times, query_times)
+                               for n in range(clients)))
+        await server.flush()
+        elapsed = time.perf_counter() - start
+
+        srv.close()
+        await srv.wait_closed()
+        await server.stop()
+
+        stored = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    total = clients * per_client
+    print(f"{clients} clients, {total} results in {elapsed:.2f} s ({total / elapsed:.0f} results/s), "
+          f"{stored} stored")
+    report("submit", submit_times)
+    report("top", query_times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test results_server.py on localhost.")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--results", type=int, default=RESULTS_PER_CLIENT, help="results per client")
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.results))
+
+if __name__ == "__main__":
+    sys.exit(main())
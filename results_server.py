@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+HOST = "127.0.0.1"
+PORT = 8766
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.sqlite3")
+
+BATCH_SIZE = 500          # Flush to SQLite after this many queued results...
+BATCH_INTERVAL = 0.5      # ...or after this many seconds, whichever comes first
+MAX_LINE_BYTES = 1 << 20
+BACKLOG = 1024            # Every station may report at the same moment
+LEADERBOARD_SIZE = 10
+
+# How each game ranks its results: "time" means lower is better, "score" higher.
+GAMES = {
+    "letters": "time",
+    "letters_words": "time",
+    "letters_sentences": "time",
+    "clicking_numbers": "time",
+    "platformer": "score",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id       INTEGER PRIMARY KEY,
+    game     TEXT NOT NULL,
+    player   TEXT NOT NULL,
+    value    REAL NOT NULL,
+    ts       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_game ON results (game, player);
+"""
+
+# --------------------------
+# LEADERBOARD INDEX
+# --------------------------
+def _finite(value):
+    """
+    value as a float if it is a real, finite number, otherwise None. bool is
+    an int subclass but never a valid result.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+class Leaderboard:
+    """
+    Best result per player for one game, kept in a sorted list so inserting
+    a result is a bisect and reading the top N is a slice.
+    """
+    def __init__(self, kind):
+        self.sign = 1 if kind == "time" else -1
+        self.best = {}        # player -> (sort_key, value)
+        self.ranking = []     # sorted [(sort_key, player)]
+
+    def add(self, player, value):
+        key = self.sign * value
+        old = self.best.get(player)
+        if old is not None:
+            if old[0] <= key:
+                return False
+            del self.ranking[bisect.bisect_left(self.ranking, (old[0], player))]
+        self.best[player] = (key, value)
+        bisect.insort(self.ranking, (key, player))
+        return True
+
+    def top(self, n):
+        return [{"rank": i + 1, "player": player, "value": self.best[player][1]}
+                for i, (_, player) in enumerate(self.ranking[:n])]
+
+# --------------------------
+# SERVICE
+# --------------------------
+class ResultsServer:
+    def __init__(self, db_path=DB_PATH, batch_size=BATCH_SIZE, batch_interval=BATCH_INTERVAL):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.boards = {game: Leaderboard(kind) for game, kind in GAMES.items()}
+        self.pending = []
+        self.flushed = asyncio.Event()
+        self.wakeup = asyncio.Event()
+        self.db = None
+        self.writer_task = None
+        self.write_failed = False  # Whether the last batch went back to pending
+        self.received = 0
+        self.written = 0
+
+    # ----- Storage -----
+    def open_db(self):
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for game, player, value in self.db.execute("SELECT game, player, value FROM results"):
+            if game in self.boards:
+                self.boards[game].add(player, value)
+
+    def write_batch(self, batch):
+        with self.db:
+            self.db.executemany("INSERT INTO results (game, player, value, ts) VALUES (?, ?, ?, ?)", batch)
+
+    async def batch_writer(self):
+        """
+        Moves queued results to SQLite in one transaction per batch, off the
+        event loop so slow disk writes never delay clients.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            self.write_failed = False
+            try:
+                if self.pending:
+                    batch, self.pending = self.pending, []
+                    try:
+                        await loop.run_in_executor(None, self.write_batch, batch)
+                    except sqlite3.Error as exc:
+                        # Keep the batch for the next round; a locked or full
+                        # database must not lose results or stop the writer.
+                        self.pending[:0] = batch
+                        self.write_failed = True
+                        print(f"Could not store {len(batch)} results, will retry: {exc}", file=sys.stderr)
+                    else:
+                        self.written += len(batch)
+            finally:
+                self.flushed.set()
+
+    async def flush(self):
+        """
+        Waits until every queued result is stored, or until a write fails;
+        the failed results stay queued for the writer's next round.
+        """
+        # Loop because results may arrive while a batch is being written.
+        while True:
+            self.flushed.clear()
+            self.wakeup.set()
+            await self.flushed.wait()
+            if not self.pending or self.write_failed:
+                return
+
+    # ----- Protocol -----
+    def submit(self, results):
+        accepted = 0
+        now = time.time()
+        for result in results:
+            # Check every field before touching any state, so a rejected
+            # result never leaves half an entry behind.
+            if not isinstance(result, dict):
+                continue
+            game = result.get("game")
+            player = str(result.get("player", "")).strip()[:40]
+            value = _finite(result.get("value"))
+            ts = _finite(result.get("ts", now))
+            if game not in self.boards or not player or value is None or ts is None:
+                continue
+            self.boards[game].add(player, value)
+            self.pending.append((game, player, value, ts))
+            accepted += 1
+        self.received += accepted
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+        return {"ok": True, "accepted": accepted}
+
+    def dispatch(self, message):
+        op = message.get("op")
+        if op == "submit":
+            return self.submit(message.get("results", []))
+        if op == "top":
+            game = message.get("game")
+            if game not in self.boards:
+                return {"ok": False, "error": f"unknown game {game!r}"}
+            n = int(message.get("n", LEADERBOARD_SIZE))
+            return {"ok": True, "game": game, "kind": GAMES[game], "top": self.boards[game].top(n)}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def handle(self, reader, writer):
+        """
+        One client connection: newline-delimited JSON requests, one JSON reply each.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.dispatch(json.loads(line))
+                except (ValueError, TypeError, AttributeError):
+                    reply = {"ok": False, "error": "bad request"}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=HOST, port=PORT):
+        self.open_db()
+        self.writer_task = asyncio.create_task(self.batch_writer())
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE_BYTES, backlog=BACKLOG)
+
+    async def stop(self):
+        await self.flush()
+        self.writer_task.cancel()
+        self.db.close()
+
+# --------------------------
+# MAIN
+# --------------------------
+async def serve(db_path, host, port):
+    server = ResultsServer(db_path)
+    srv = await server.start(host, port)
+    print(f"Collecting results on {host}:{port} into {db_path}")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        await server.stop()
+
+async def show(host, port, game, n):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"op": "top", "game": game, "n": n}).encode("utf-8") + b"\n")
+    reply = json.loads(await reader.readline())
+    writer.close()
+    if not reply["ok"]:
+        print(reply["error"])
+        return
+    unit = " s" if reply["kind"] == "time" else ""
+    print(f"--- {game} ---")
+    for row in reply["top"]:
+        print(f"{row['rank']:>3}. {row['player']:<20} {row['value']:.2f}{unit}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Classroom leaderboard service for the kids' games.")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "top"],
+                        help="run the service (default) or print a leaderboard")
+    parser.add_argument("game", nargs="?", default="letters", choices=sorted(GAMES))
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("-n", type=int, default=LEADERBOARD_SIZE)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "top":
+            asyncio.run(show(args.host, args.port, args.game, args.n))
+        else:
+            asyncio.run(serve(args.db, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import pygame
+import pytest
+
+from platform_env import platformer
+
+# Coarse steps must land, block and stomp exactly where one-frame steps do.
+COARSE_STEPS = [2, 4, 8]
+FRAMES = 48               # Divisible by every step size above
+
+# --------------------------
+# HELPERS
+# --------------------------
+def make_player(x, bottom=platformer.GROUND_Y, vel_y=0):
+    player = platformer.Player(x)
+    player.rect.bottom = bottom
+    player.sync_position()
+    player.vel_y = vel_y
+    return player
+
+def make_enemy(x, vx=0):
+    enemy = platformer.Enemy(x)
+    enemy.vx = vx
+    return enemy
+
+def platform_group(*specs):
+    return pygame.sprite.Group(platformer.Platform(0, platformer.GROUND_Y, platformer.SCREEN_WIDTH),
+                               *(platformer.Platform(*spec) for spec in specs))
+
+def run(dt, setup, dx=0, jump=False, frames=FRAMES, move_enemies=False):
+    """
+    Steps a fresh scene from setup() for frames frames in steps of dt and
+    returns what the player and enemies ended up as. Enemies are moved after
+    the player each step, the same order Game.step uses.
+    """
+    player, platforms, enemies = setup()
+    solids = [plat.rect for plat in platforms] + platformer.SCREEN_WALLS
+    if jump:
+        player.jump()
+    for _ in range(frames // dt):
+        player.update(platforms, enemies, dt=dt, dx=dx)
+        if move_enemies:
+            for enemy in enemies:
+                platformer.move_body(enemy, enemy.vx, dt, solids)
+    return {"x": player.pos_x, "y": player.pos_y, "vel_y": player.vel_y,
+            "score": player.score, "lives": player.lives,
+            "enemies": sorted((e.pos_x, e.pos_y) for e in enemies)}
+
+def assert_same(fine, coarse):
+    for key in ("x", "y", "vel_y"):
+        assert coarse[key] == pytest.approx(fine[key], abs=1e-6), key
+    assert (coarse["score"], coarse["lives"]) == (fine["score"], fine["lives"])
+    assert coarse["enemies"] == pytest.approx(fine["enemies"], abs=1e-6)
+
+# --------------------------
+# LANDING
+# --------------------------
+def drop_onto_platform():
+    return make_player(250, bottom=100), platform_group((200, 450, 150)), pygame.sprite.Group()
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_landing_matches_fine_steps(dt):
+    fine = run(1, drop_onto_platform)
+    assert fine["y"] + 40 == 450 and fine["vel_y"] == 0
+    assert_same(fine, run(dt, drop_onto_platform))
+
+def test_one_huge_step_does_not_tunnel():
+    player, platforms, enemies = drop_onto_platform()
+    player.vel_y = 40
+    player.update(platforms, enemies, dt=60, dx=0)
+    assert player.rect.bottom == 450 and player.vel_y == 0
+
+# --------------------------
+# BLOCKING
+# --------------------------
+def level_one():
+    platforms, _, _, _, _ = platformer.create_level(1)
+    return make_player(50), platforms, pygame.sprite.Group()
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_falling_past_a_side_resumes_sideways_motion(dt):
+    # Jumping right into the side of the first platform, the player slides
+    # down its side and moves on once below it.
+    fine = run(1, level_one, dx=platformer.PLAYER_SPEED, jump=True, frames=32)
+    assert fine["x"] > 200 - 30
+    assert_same(fine, run(dt, level_one, dx=platformer.PLAYER_SPEED, jump=True, frames=32))
+
+def walk_into_screen_edge():
+    return make_player(700), platform_group(), pygame.sprite.Group()
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_screen_edge_blocks_like_fine_steps(dt):
+    fine = run(1, walk_into_screen_edge, dx=platformer.PLAYER_SPEED, jump=True)
+    assert fine["x"] == platformer.SCREEN_WIDTH - 30
+    assert_same(fine, run(dt, walk_into_screen_edge, dx=platformer.PLAYER_SPEED, jump=True))
+
+def jump_under_platform():
+    return make_player(250), platform_group((200, 450, 150)), pygame.sprite.Group()
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_head_bump_matches_fine_steps(dt):
+    fine = run(1, jump_under_platform, jump=True, frames=8)
+    # Bumped into the underside at y=470 and already falling back down.
+    assert fine["y"] >= 470 and fine["vel_y"] > 0
+    assert_same(fine, run(dt, jump_under_platform, jump=True, frames=8))
+
+# --------------------------
+# STOMPING
+# --------------------------
+def fall_onto_enemy():
+    return make_player(500, bottom=200), platform_group(), pygame.sprite.Group(make_enemy(505))
+
+def fall_onto_moving_enemy():
+    return make_player(500, bottom=300), platform_group(), pygame.sprite.Group(make_enemy(560, vx=-2))
+
+def walk_into_enemy():
+    return make_player(400), platform_group(), pygame.sprite.Group(make_enemy(505))
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_stomp_matches_fine_steps(dt):
+    fine = run(1, fall_onto_enemy)
+    assert fine["score"] == 10 and fine["enemies"] == []
+    assert_same(fine, run(dt, fall_onto_enemy))
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_stomp_on_moving_enemy_matches_fine_steps(dt):
+    fine = run(1, fall_onto_moving_enemy, move_enemies=True)
+    assert fine["score"] == 10 and fine["lives"] == 3 and fine["enemies"] == []
+    assert_same(fine, run(dt, fall_onto_moving_enemy, move_enemies=True))
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_side_hit_costs_a_life_like_fine_steps(dt):
+    fine = run(1, walk_into_enemy, dx=platformer.PLAYER_SPEED)
+    assert fine["score"] == 0 and fine["lives"] == 2
+    assert_same(fine, run(dt, walk_into_enemy, dx=platformer.PLAYER_SPEED))
+
+# --------------------------
+# ENEMY NAVIGATION
+# --------------------------
+def run_game(level, dt, pin, frames):
+    """
+    Steps Game(level) with the player held at pin and returns where the
+    enemies ended up.
+    """
+    game = platformer.Game(level)
+    for _ in range(frames // dt):
+        game.player.rect.topleft = pin
+        game.player.sync_position()
+        game.player.vel_y = 0
+        game.step(0, dt)
+    return sorted((e.pos_x, e.pos_y) for e in game.enemies)
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_enemy_patrol_matches_fine_steps(level, dt):
+    # Held in the air the player is on no platform, so enemies only patrol,
+    # turning at platform ends many times over.
+    fine = run_game(level, 1, (500, 100), 480)
+    assert run_game(level, dt, (500, 100), 480) == pytest.approx(fine, abs=1e-6)
+
+@pytest.mark.parametrize("dt", COARSE_STEPS)
+def test_enemy_chase_matches_fine_steps(dt):
+    # Standing on the 400-550 platform the player draws level 1's enemy
+    # through two jumps; it stops short of touching the player.
+    fine = run_game(1, 1, (500, 310), 144)
+    assert fine[0][1] == 320
+    assert run_game(1, dt, (500, 310), 144) == pytest.approx(fine, abs=1e-6)
+
+def test_enemy_landing_over_an_edge_walks_back_on():
+    # Level 1's jump onto the 400-550 platform lands overhanging its left
+    # edge; the enemy must still be able to chase the player from there.
+    game = platformer.Game(1)
+    player = game.player
+    reached = False
+    for _ in range(200):
+        player.rect.topleft = (500, 310)
+        player.sync_position()
+        player.vel_y = 0
+        game.step(0, 1)
+        reached = reached or any(enemy.rect.left >= 400 and enemy.rect.bottom == 350
+                                 for enemy in game.enemies)
+    assert reached
@@ -0,0 +1,221 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+from array import array
+
+# --------------------------
+# CONFIGURATION & CONSTANTS
+# --------------------------
+# Word lists are plain UTF-8 text, one word or sentence per line, optionally
+# followed by a tab and a difficulty level (1 = easiest):
+#
+#     CAT	1
+#     ELEPHANT	3
+#     THE DOG CAN RUN	2
+#
+# Only lines made of the letters A-Z (any case) and single spaces are used.
+INDEX_SUFFIX = ".idx"
+# Where the index goes when the word list's own directory is read-only.
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "linux_kids")
+MAGIC = b"KWIX"
+VERSION = 1
+MAX_LENGTH = 255
+MAX_LEVEL = 255
+DEFAULT_LEVEL = 1
+
+# magic, version, source size, source mtime, bucket count, entry count
+HEADER = struct.Struct("<4sIQQII")
+# is_sentence, length, level, start entry, entry count
+BUCKET = struct.Struct("<BBBxII")
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# --------------------------
+# HELPER FUNCTIONS
+# --------------------------
+def letter_mask(text):
+    """
+    Returns a 26-bit mask with one bit per distinct letter in text.
+    """
+    mask = 0
+    for char in text:
+        if "A" <= char <= "Z":
+            mask |= 1 << (ord(char) - 65)
+    return mask
+
+def parse_line(line):
+    """
+    Returns (text, level) for a usable word-list line, or None.
+    """
+    text, _, level = line.partition("\t")
+    text = " ".join(text.split()).upper()
+    if not text or len(text) > MAX_LENGTH or any(c != " " and c not in ALPHABET for c in text):
+        return None
+    try:
+        level = int(level) if level.strip() else DEFAULT_LEVEL
+    except ValueError:
+        level = DEFAULT_LEVEL
+    return text, max(1, min(level, MAX_LEVEL))
+
+def build_index(source, index_path):
+    """
+    Reads the whole word list once and writes the binary index to
+    index_path: entries grouped into (kind, length, level) buckets, each entry holding the
+    byte offset and length of the word in the source file and its letter mask.
+    """
+    st = os.stat(source)
+    buckets = {}
+    with open(source, "rb") as f:
+        offset = 0
+        for raw in f:
+            parsed = parse_line(raw.decode("utf-8", "replace"))
+            if parsed is not None:
+                text, level = parsed
+                start = offset + len(raw) - len(raw.lstrip())
+                key = (" " in text, len(text), level)
+                # The raw length up to the tab is what pick() reads back.
+                raw_len = len(raw.split(b"\t", 1)[0].strip())
+                if raw_len > 0xFFFF:
+                    offset += len(raw)
+                    continue
+                buckets.setdefault(key, []).append((start, raw_len, letter_mask(text)))
+            offset += len(raw)
+
+    offsets, lengths, masks = array("I"), array("H"), array("I")
+    table = []
+    for key in sorted(buckets):
+        entries = buckets[key]
+        table.append(BUCKET.pack(int(key[0]), key[1], key[2], len(offsets), len(entries)))
+        for start, raw_len, mask in entries:
+            offsets.append(start)
+            lengths.append(raw_len)
+            masks.append(mask)
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, st.st_size, st.st_mtime_ns, len(table), len(offsets)))
+        f.write(b"".join(table))
+        f.write(offsets.tobytes())
+        f.write(masks.tobytes())
+        f.write(lengths.tobytes())
+    os.replace(tmp_path, index_path)
+
+# --------------------------
+# INDEX
+# --------------------------
+class WordPool:
+    """
+    The words matching one query, as a list of entry numbers. pick() is O(1).
+    """
+    def __init__(self, index, entries):
+        self.index = index
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def pick(self, rng=random):
+        return self.index.word(self.entries[rng.randrange(len(self.entries))])
+
+class WordIndex:
+    """
+    Memory-mapped view of a graded word list. Nothing is read until the first
+    query; the index file is (re)built only when it is missing or older than
+    the word list, so normal startups never parse the list itself. It lives
+    next to the word list, or in CACHE_DIR if that directory is read-only.
+    If neither works the index reports itself unavailable.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+        self.cache_path = os.path.join(CACHE_DIR, f"{os.path.basename(path)}-{name}{INDEX_SUFFIX}")
+        self.buckets = None
+        self.broken = False
+        self.pools = {}
+
+    def available(self):
+        return not self.broken and os.path.isfile(self.path) and os.path.getsize(self.path) > 0
+
+    def _index_is_current(self, index_path):
+        try:
+            with open(index_path, "rb") as f:
+                header = f.read(HEADER.size)
+            magic, version, size, mtime_ns, _, _ = HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        st = os.stat(self.path)
+        return magic == MAGIC and version == VERSION and size == st.st_size and mtime_ns == st.st_mtime_ns
+
+    def _build(self):
+        try:
+            build_index(self.path, self.index_path)
+            return self.index_path
+        except OSError:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            build_index(self.path, self.cache_path)
+            return self.cache_path
+
+    def _load(self):
+        if self.buckets is not None:
+            return
+        for index_path in (self.index_path, self.cache_path):
+            if self._index_is_current(index_path):
+                break
+        else:
+            index_path = self._build()
+        with open(index_path, "rb") as f:
+            self.index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.path, "rb") as f:
+            self.words_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _, _, _, _, n_buckets, n_entries = HEADER.unpack_from(self.index_map, 0)
+        self.buckets = [BUCKET.unpack_from(self.index_map, HEADER.size + i * BUCKET.size)
+                        for i in range(n_buckets)]
+        view = memoryview(self.index_map)
+        pos = HEADER.size + n_buckets * BUCKET.size
+        self.offsets = view[pos:pos + 4 * n_entries].cast("I")
+        pos += 4 * n_entries
+        self.masks = view[pos:pos + 4 * n_entries].cast("I")
+        pos += 4 * n_entries
+        self.lengths = view[pos:pos + 2 * n_entries].cast("H")
+
+    def word(self, entry):
+        start = self.offsets[entry]
+        raw = self.words_map[start:start + self.lengths[entry]]
+        return " ".join(raw.decode("utf-8").split()).upper()
+
+    def pool(self, min_length=1, max_length=MAX_LENGTH, max_level=MAX_LEVEL, letters=None, sentences=False):
+        """
+        Returns a WordPool of the words (or sentences) whose length and level
+        fall in range and, if letters is given, that use only those letters.
+        Pools are cached, so repeating a query costs nothing. The pool is
+        empty if the word list cannot be read or indexed.
+        """
+        allowed = letter_mask(letters) if letters is not None else None
+        key = (min_length, max_length, max_level, allowed, sentences)
+        pool = self.pools.get(key)
+        if pool is not None:
+            return pool
+
+        try:
+            self._load()
+        except OSError:
+            self.broken = True
+            return WordPool(self, array("I"))
+        entries = array("I")
+        for is_sentence, length, level, start, count in self.buckets:
+            if bool(is_sentence) != sentences or not min_length <= length <= max_length or level > max_level:
+                continue
+            if allowed is None:
+                entries.extend(range(start, start + count))
+            else:
+                # Only the mask column is touched; the words themselves stay on disk.
+                blocked = ~allowed
+                masks = self.masks
+                entries.extend(i for i in range(start, start + count) if not masks[i] & blocked)
+        pool = WordPool(self, entries)
+        self.pools[key] = pool
+        return pool